@@ -1,92 +1,43 @@
-import pickle
+import concurrent.futures
+import os
+from board import vertical_run_ends
+from dawg import ALPHABET, BLANK, DAWG, external_sort, lexicon_fingerprint, read_fingerprint
+import scoring
 
-def create_node(id_counter=[0]):
-    """
-    Creates a new node in a trie or Directed Acyclic Word Graph (DAWG) structure.
-
-    Parameters:
-    - id_counter (list of int, default=[0]): A list containing a single integer that acts as a unique identifier for each node created. This counter is incremented every time a new node is created.
-
-    Returns:
-    - dict: A new node represented as a dictionary with three keys:
-        - 'children' (dict): An empty dictionary to hold child nodes.
-        - 'is_terminal' (bool): A boolean flag indicating whether the node represents the end of a valid word in the trie.
-        - 'id' (int): A unique identifier for the node.
-    """
-    id_counter[0] += 1
-    return {
-        'children': {},
-        'is_terminal': False,
-        'id': id_counter[0]
-    }
-
-def insert(root, word):
-    """
-    Inserts a word into the trie or DAWG rooted at the given node.
+# Separates the reversed prefix from the suffix in GADDAG entries
+SEPARATOR = '+'
 
-    Parameters:
-    - root (dict): The root node of the trie or DAWG where the word will be inserted.
-    - word (str): The word to be inserted into the trie.
-
-    Returns:
-    - None: This function modifies the trie in place by adding nodes for each character of the word if they do not already exist.
-    """
-    node = root
-    for char in word:
-        if char not in node['children']:
-            node['children'][char] = create_node()
-        node = node['children'][char]
-    node['is_terminal'] = True
+LEXICON_PATH = "lexicon/Collins Scrabble Words (2019).txt"
 
-def minimize(node, nodes=None):
-    """
-    Minimizes a trie into a DAWG by merging equivalent nodes, which are nodes having the same children and terminal status.
+# The longest word that fits on the board
+MAX_WORD_LENGTH = 15
 
-    Parameters:
-    - node (dict): The node from which to start the minimization process.
-    - nodes (dict, optional): A dictionary used to keep track of nodes that have already been processed to facilitate node merging. If not provided, an empty dictionary is initialized.
+# Cross-checks are bitmasks with bit i set if the i-th letter of the alphabet is allowed
+ALL_LETTERS_MASK = (1 << len(ALPHABET)) - 1
 
-    Returns:
-    - tuple: A unique identifier for the node, used to check and manage node equivalency during the minimization process.
-    """
-    if nodes is None:
-        nodes = {}
-    if not node['children']:
-        node_id = (node['is_terminal'],)
-    else:
-        child_tuples = []
-        for char, next_node in sorted(node['children'].items()):
-            minimized_child_id = minimize(next_node, nodes)
-            child_tuples.append((char, minimized_child_id))
-        node_id = (node['is_terminal'],) + tuple(child_tuples)
-
-    if node_id in nodes:
-        existing_node = nodes[node_id]
-        node['children'] = existing_node['children']
-        node['is_terminal'] = existing_node['is_terminal']
-        node['id'] = existing_node['id']
-    else:
-        nodes[node_id] = node
-    return node_id
+# The letters a blank is placed as, by alphabet index
+BLANK_LETTERS = ALPHABET.lower()
 
 def search_terminal_word(root, word):
     """
-    Searches for a word in a trie and checks if it is a terminal word (i.e., a complete and valid word).
+    Searches for a word in a DAWG and checks if it is a terminal word (i.e., a complete and valid word).
 
     Parameters:
-    - root (dict): The root node of the trie.
-    - word (str): The word to search for in the trie.
+    - root (DAWG): The DAWG to search in.
+    - word (str): The word to search for in the DAWG.
 
     Returns:
-    - bool: True if the word exists in the trie and is marked as terminal, False otherwise.
+    - bool: True if the word exists in the DAWG and is marked as terminal, False otherwise.
     """
-    node = root
+    edges = root.edges
+    width = root.width
+    letter_index = root.letter_index
+    node = root.root
     for char in word:
-        if char in node['children']:
-            node = node['children'][char]
-        else:
+        node = edges[node * width + letter_index[char]]
+        if not node:
             return False
-    return node['is_terminal']
+    return bool(root.terminal[node >> 3] & (1 << (node & 7)))
 
 def find_anchor_positions(board):
     """
@@ -115,6 +66,30 @@ def find_anchor_positions(board):
         return [(7, 7)]
     return anchors
 
+def update_anchor_positions(anchor_state, board, placed_cells):
+    """
+    Updates the anchor positions after tiles have been placed, instead of scanning the whole board again. Placed
+    tiles are no longer anchors and their empty neighbours become anchors.
+
+    Parameters:
+    - anchor_state (dict): Maps False to the set of anchors of the board and True to the anchors of the transposed board.
+    - board (list of lists): The board after the tiles have been placed.
+    - placed_cells (list of tuples): The (row, col) positions of the placed tiles.
+
+    Returns:
+    - dict: The updated anchor_state, which is modified in place.
+    """
+    anchors = anchor_state[False]
+    transposed_anchors = anchor_state[True]
+    for row, col in placed_cells:
+        anchors.discard((row, col))
+        transposed_anchors.discard((col, row))
+        for neighbour_row, neighbour_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= neighbour_row < 15 and 0 <= neighbour_col < 15 and board[neighbour_row][neighbour_col] == ' ':
+                anchors.add((neighbour_row, neighbour_col))
+                transposed_anchors.add((neighbour_col, neighbour_row))
+    return anchor_state
+
 def precompute_cross_checks(root, board):
     """
     Computes valid letters for each empty cell on the board that can potentially form valid words vertically.
@@ -123,18 +98,81 @@ def precompute_cross_checks(root, board):
     - board (list of lists): A 15x15 grid representing the board, where each cell contains a letter or a space.
 
     Returns:
-    - dict: A dictionary mapping (row, col) tuples of empty cells to a list of valid letters that can be placed there 
-      based on vertical word formation.
+    - dict: A dictionary mapping (row, col) tuples of empty cells to a bitmask of the valid letters that can be placed there
+      based on vertical word formation, bit i stands for the i-th letter of the alphabet.
     """
     cross_checks = {}
     for row in range(15):
         for col in range(15):
             if board[row][col] == ' ':
-                valid_letters = set()
-                for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-                    if is_cross_check_valid(root, letter, (row, col), board):
-                        valid_letters.add(letter)
-                cross_checks[(row, col)] = sorted(valid_letters)
+                cross_checks[(row, col)] = cross_check_mask(root, (row, col), board)
+    return cross_checks
+
+def cross_check_mask(root, anchor, board):
+    """
+    Computes the bitmask of letters that form a valid vertical word when placed in an empty cell. The letters above
+    the cell are walked once, after that only the letters below the cell are walked for each child of the reached node.
+
+    Parameters:
+    - root (DAWG): The DAWG of the lexicon.
+    - anchor (tuple): The (row, col) position of the empty cell.
+    - board (list of lists): The board.
+
+    Returns:
+    - int: The bitmask of the valid letters, all letters if there are no tiles directly above or below the cell.
+    """
+    row, col = anchor
+    above = row
+    while above > 0 and board[above - 1][col] != ' ':
+        above -= 1
+    below = row
+    while below < 14 and board[below + 1][col] != ' ':
+        below += 1
+    if above == row and below == row:
+        return ALL_LETTERS_MASK
+
+    edges = root.edges
+    width = root.width
+    letter_index = root.letter_index
+    terminal = root.terminal
+    node = root.root
+    for r in range(above, row):
+        node = edges[node * width + letter_index[board[r][col]]]
+        if not node:
+            return 0
+
+    mask = 0
+    base = node * width
+    for i in range(width):
+        child = edges[base + i]
+        for r in range(row + 1, below + 1):
+            if not child:
+                break
+            child = edges[child * width + letter_index[board[r][col]]]
+        if child and terminal[child >> 3] & (1 << (child & 7)):
+            mask |= 1 << i
+    return mask
+
+def update_cross_checks(root, board, cross_checks, placed_cells):
+    """
+    Updates precomputed cross-checks after tiles have been placed on the board. The valid letters of an empty cell only
+    depend on the tiles directly above and below it, so only the empty cells at both ends of the vertical run of tiles
+    through each placed tile are recomputed.
+
+    Parameters:
+    - root (DAWG): The DAWG of the lexicon.
+    - board (list of lists): The board after the tiles have been placed.
+    - cross_checks (dict): The cross-checks of the board before the tiles were placed, as made by `precompute_cross_checks`.
+    - placed_cells (list of tuples): The (row, col) positions of the placed tiles.
+
+    Returns:
+    - dict: The updated cross_checks dictionary, which is modified in place.
+    """
+    for cell in placed_cells:
+        cross_checks.pop(cell, None)
+
+    for row, col in vertical_run_ends(board, placed_cells):
+        cross_checks[(row, col)] = cross_check_mask(root, (row, col), board)
     return cross_checks
 
 def is_cross_check_valid(root, letter, anchor, board):
@@ -180,6 +218,22 @@ def collect_vertical_word(anchor, board):
         row += 1
     return word
 
+def count_rack(rack):
+    """
+    Counts the letters on a rack, so the generators try every distinct letter once instead of every tile. Blanks are
+    counted under `BLANK`.
+
+    Parameters:
+    - rack (list of str): The letters on the rack.
+
+    Returns:
+    - dict: The number of tiles of each letter, in the order the letters first appear on the rack.
+    """
+    rack_counts = {}
+    for letter in rack:
+        rack_counts[letter] = rack_counts.get(letter, 0) + 1
+    return rack_counts
+
 def generate_word_left(anchor, rack, board, cross_checks, reversed_root):
     """
     Generates all possible leftward word extensions from a given anchor point using the letters in the player's rack.
@@ -188,7 +242,7 @@ def generate_word_left(anchor, rack, board, cross_checks, reversed_root):
     - anchor (tuple): The (row, col) position on the board from which to extend words leftward.
     - rack (list of str): List of characters available to the player to form words.
     - board (list of lists): The board represented as a 15x15 grid of characters.
-    - cross_checks (dict): Dictionary containing valid letters for each board position, precomputed for vertical words.
+    - cross_checks (dict): Dictionary containing the bitmask of valid letters for each board position, precomputed for vertical words.
 
     Returns:
     - list of tuples: Each tuple contains details of a valid move including parts of the word before and after the anchor,
@@ -196,16 +250,11 @@ def generate_word_left(anchor, rack, board, cross_checks, reversed_root):
     """
     moves = []  # Initialize a list to hold all valid moves
     right_part = collect_right_part_from_board(anchor, board)  # Collect contiguous letters to the right of the anchor
-    start_node = reversed_root  # Starting point in the DAWG
     right_part = ''.join(reversed(right_part))
-    if right_part:
-        # Traverse the DAWG to the node matching the end of the right_part
-        # print(right_part_start_node)
-        for char in right_part:
-            if char in start_node['children']:
-                start_node = start_node['children'][char]
+    # Traverse the DAWG to the node matching the end of the right_part, the sink node (0) if it is not in the DAWG
+    start_node = reversed_root.walk(right_part)
     # Call extend_left to recursively try building words to the left from the current node
-    extend_left(reversed_root, right_part, right_part, "", start_node, anchor, anchor, rack, board, moves, cross_checks)
+    extend_left(reversed_root, right_part, [], start_node, anchor, anchor, count_rack(rack), board, moves, cross_checks)
     return moves
 
 def collect_right_part_from_board(anchor, board):
@@ -227,23 +276,22 @@ def collect_right_part_from_board(anchor, board):
         col += 1
     return right_part
 
-def extend_left(reversed_root, partial_word, initial_right_part, left_part, node, anchor, initial_anchor, rack, board, moves, cross_checks, used_from_rack=False):
+def extend_left(reversed_root, initial_right_part, placed, node, anchor, initial_anchor, rack, board, moves, cross_checks):
     """
     Recursively extends a word to the left from a specified anchor point, using available letters in the rack, considering
     cross-check constraints for forming valid vertical words.
 
     Parameters:
-    - partial_word (str): The word formed so far during recursion.
-    - initial_right_part (str): The initial letters collected to the right of the anchor point.
-    - left_part (str): The letters collected to the left of the anchor point during recursion.
-    - node (dict): Current node in the DAWG representing the last letter of the left_part.
+    - initial_right_part (str): The initial letters collected to the right of the anchor point, reversed.
+    - placed (list of str): The letters placed from the rack so far, from right to left. The same list is used for the
+      whole search, strings are only built when a move is found.
+    - node (int): Current node in the DAWG representing the last letter placed.
     - anchor (tuple): Current (row, col) position during recursion.
     - initial_anchor (tuple): Original (row, col) position from which leftward extension started.
-    - rack (list of str): Remaining letters in the player's rack.
+    - rack (dict): Remaining letters in the player's rack and their counts, see `count_rack`.
     - board (list of lists): The board.
     - moves (list of tuples): Accumulates valid moves found during recursion.
-    - cross_checks (dict): Contains valid letters for each position for vertical compatibility.
-    - used_from_rack (bool): Indicates if at least one letter from the rack has been used, ensuring move validity.
+    - cross_checks (dict): Contains the bitmask of valid letters for each position for vertical compatibility.
 
     Returns:
     - None: Modifies the moves list in-place by appending valid moves as they are found.
@@ -255,18 +303,40 @@ def extend_left(reversed_root, partial_word, initial_right_part, left_part, node
         return
 
     if board[row][col] == ' ':
-        # Check if a valid word is formed at the terminal node and add it to moves if it's not seen before
-        if node['is_terminal'] and used_from_rack and search_terminal_word(reversed_root, partial_word):
-            initial_right_part = ''.join(reversed(initial_right_part))
-            moves.append((initial_right_part, left_part, partial_word, initial_anchor, 'left'))
-
-        # Explore extending the word to the left using each letter in the rack
-        for i, letter in enumerate(rack):
-            if letter in node['children'] and letter in cross_checks[(row, col)]:
-                new_rack = rack[:i] + rack[i+1:] # Create a new rack without the current letter
-                new_left_part = letter + left_part # Add the current letter to the left part of the word
+        # The node is reached with the letters of the word, so a terminal node means a valid word
+        if placed and reversed_root.terminal[node >> 3] & (1 << (node & 7)):
+            partial_word = initial_right_part + ''.join(placed)
+            moves.append((initial_right_part[::-1], ''.join(reversed(placed)), partial_word, initial_anchor, 'left'))
+
+        # Explore extending the word to the left using each distinct letter left on the rack
+        edges = reversed_root.edges
+        base = node * reversed_root.width
+        letter_index = reversed_root.letter_index
+        valid_letters = cross_checks[(row, col)]
+        for letter, count in rack.items():
+            if not count or letter == BLANK:
+                continue
+            index = letter_index[letter]
+            child = edges[base + index]
+            if child and valid_letters >> index & 1:
+                rack[letter] = count - 1 # Take the letter from the rack, and put it back after the recursion
+                placed.append(letter)
                 # Recursive call to try extending further to the left
-                extend_left(reversed_root, partial_word + letter, initial_right_part, new_left_part, node['children'][letter], (row, col - 1), initial_anchor, new_rack, board, moves, cross_checks, True)
+                extend_left(reversed_root, initial_right_part, placed, child, (row, col - 1), initial_anchor, rack, board, moves, cross_checks)
+                placed.pop()
+                rack[letter] = count
+
+        # A blank only branches on the letters that continue a word and are allowed by the cross-checks
+        blanks = rack.get(BLANK)
+        if blanks:
+            rack[BLANK] = blanks - 1
+            for index in range(len(ALPHABET)):
+                child = edges[base + index]
+                if child and valid_letters >> index & 1:
+                    placed.append(BLANK_LETTERS[index])
+                    extend_left(reversed_root, initial_right_part, placed, child, (row, col - 1), initial_anchor, rack, board, moves, cross_checks)
+                    placed.pop()
+            rack[BLANK] = blanks
 
 def generate_word_right(anchor, rack, board, cross_checks, root):
     """
@@ -276,7 +346,7 @@ def generate_word_right(anchor, rack, board, cross_checks, root):
     - anchor (tuple): The (row, col) position on the board from which to extend words rightward.
     - rack (list of str): List of characters available to the player to form words.
     - board (list of lists): The board represented as a 15x15 grid of characters.
-    - cross_checks (dict): Dictionary containing valid letters for each board position, precomputed for vertical words.
+    - cross_checks (dict): Dictionary containing the bitmask of valid letters for each board position, precomputed for vertical words.
 
     Returns:
     - list of tuples: Each tuple contains details of a valid move including parts of the word before and after the anchor,
@@ -284,14 +354,10 @@ def generate_word_right(anchor, rack, board, cross_checks, root):
     """
     moves = [] # Initialize a list to hold all valid moves
     left_part = collect_left_part_from_board(anchor, board) # Collect contiguous letters to the left of the anchor
-    start_node = root # Starting point in the DAWG
-    if left_part:
-        # Traverse the trie to the node matching the end of the left_part
-        for char in left_part:
-            if char in start_node['children']:
-                start_node = start_node['children'][char]
+    # Traverse the DAWG to the node matching the end of the left_part, the sink node (0) if it is not in the DAWG
+    start_node = root.walk(left_part)
     # Call extend_right to recursively try building words to the right from the current node
-    extend_right(root, left_part, left_part, "", start_node, anchor, anchor, rack, board, moves, cross_checks)
+    extend_right(root, left_part, [], start_node, anchor, anchor, count_rack(rack), board, moves, cross_checks)
     return moves
 
 def collect_left_part_from_board(anchor, board):
@@ -313,23 +379,22 @@ def collect_left_part_from_board(anchor, board):
         left_part = board[row][col] + left_part
     return left_part
 
-def extend_right(root, partial_word, initial_left_part, right_part, node, anchor, initial_anchor, rack, board, moves, cross_checks, used_from_rack=False):
+def extend_right(root, initial_left_part, placed, node, anchor, initial_anchor, rack, board, moves, cross_checks):
     """
     Recursively extends a word to the right from a specified anchor point, using available letters in the rack, considering
     cross-check constraints for forming valid vertical words.
 
     Parameters:
-    - partial_word (str): The word formed so far during recursion.
     - initial_left_part (str): The initial letters collected to the left of the anchor point.
-    - right_part (str): The letters collected to the right of the anchor point during recursion.
-    - node (dict): Current node in the trie representing the last letter of the right_part.
+    - placed (list of str): The letters placed from the rack so far. The same list is used for the whole search,
+      strings are only built when a move is found.
+    - node (int): Current node in the DAWG representing the last letter placed.
     - anchor (tuple): Current (row, col) position during recursion.
     - initial_anchor (tuple): Original (row, col) position from which rightward extension started.
-    - rack (list of str): Remaining letters in the player's rack.
+    - rack (dict): Remaining letters in the player's rack and their counts, see `count_rack`.
     - board (list of lists): The board.
     - moves (list of tuples): Accumulates valid moves found during recursion.
-    - cross_checks (dict): Contains valid letters for each position for vertical compatibility.
-    - used_from_rack (bool): Indicates if at least one letter from the rack has been used, ensuring move validity.
+    - cross_checks (dict): Contains the bitmask of valid letters for each position for vertical compatibility.
 
     Returns:
     - None: Modifies the moves list in-place by appending valid moves as they are found.
@@ -341,15 +406,323 @@ def extend_right(root, partial_word, initial_left_part, right_part, node, anchor
         return
 
     if board[row][col] == ' ':
-        # Check if a valid word is formed at the terminal node and add it to moves
-        if node['is_terminal'] and used_from_rack and search_terminal_word(root, partial_word):
-            moves.append((initial_left_part, right_part, partial_word, initial_anchor, 'right'))
+        # The node is reached with the letters of the word, so a terminal node means a valid word
+        if placed and root.terminal[node >> 3] & (1 << (node & 7)):
+            right_part = ''.join(placed)
+            moves.append((initial_left_part, right_part, initial_left_part + right_part, initial_anchor, 'right'))
+
+        edges = root.edges
+        base = node * root.width
+        letter_index = root.letter_index
+        valid_letters = cross_checks[(row, col)]
+        for letter, count in rack.items():
+            if not count or letter == BLANK:
+                continue
+            index = letter_index[letter]
+            child = edges[base + index]
+            if child and valid_letters >> index & 1:
+                rack[letter] = count - 1
+                placed.append(letter)
+                extend_right(root, initial_left_part, placed, child, (row, col + 1), initial_anchor, rack, board, moves, cross_checks)
+                placed.pop()
+                rack[letter] = count
+
+        blanks = rack.get(BLANK)
+        if blanks:
+            rack[BLANK] = blanks - 1
+            for index in range(len(ALPHABET)):
+                child = edges[base + index]
+                if child and valid_letters >> index & 1:
+                    placed.append(BLANK_LETTERS[index])
+                    extend_right(root, initial_left_part, placed, child, (row, col + 1), initial_anchor, rack, board, moves, cross_checks)
+                    placed.pop()
+            rack[BLANK] = blanks
+
+def gaddag_entries(word):
+    """
+    Lists the paths a word is stored under in a GADDAG (Gordon, 1993). For every split of the word the letters before
+    the split are reversed and followed by the separator and the rest of the word, so every letter can serve as the
+    starting point of a path.
+
+    Parameters:
+    - word (str): The word to be stored.
+
+    Returns:
+    - list of str: One entry per letter of the word, e.g. 'C+AT', 'AC+T' and 'TAC+' for 'CAT'.
+    """
+    return [word[:i][::-1] + SEPARATOR + word[i:] for i in range(1, len(word) + 1)]
+
+def generate_word_gaddag(anchor, rack, board, cross_checks, gaddag, anchors, is_transposed=False, cross_scores=None, best_score=None):
+    """
+    Generates all moves that place a tile on the anchor, using a GADDAG. Starting at the anchor the word is built
+    to the left first, through any tiles already on the board, and after the separator it is continued to the right.
+    To generate every placement only once, the left part never covers another anchor, so a move is only found from the
+    leftmost anchor it covers. The score of the move is kept up to date while the word is built, so every move is
+    found together with its complete score.
 
-        for i, letter in enumerate(rack):
-            if letter in node['children'] and letter in cross_checks[(row, col)]:
-                new_rack = rack[:i] + rack[i+1:]
-                new_right_part = right_part + letter
-                extend_right(root, partial_word + letter, initial_left_part, new_right_part, node['children'][letter], (row, col + 1), initial_anchor, new_rack, board, moves, cross_checks, True)
+    Parameters:
+    - anchor (tuple): The (row, col) position of the empty anchor square.
+    - rack (list of str): List of characters available to the player to form words.
+    - board (list of lists): The board represented as a 15x15 grid of characters.
+    - cross_checks (dict): Dictionary containing the bitmask of valid letters for each board position, precomputed for vertical words.
+    - gaddag (DAWG): The GADDAG of the lexicon, see `gaddag_entries`.
+    - anchors (set of tuples): All anchor positions on the board.
+    - is_transposed (bool, default=False): Whether the board is transposed. One tile moves that also form a word in
+      the other direction are skipped on the transposed board, since they are already found on the normal board.
+    - cross_scores (dict, optional): The scores of the vertical words, see `scoring.precompute_cross_scores`. They are
+      computed from the board when not given.
+    - best_score (list of int, optional): A list holding the best score found so far. When given only moves that beat
+      it are recorded, and it is raised with every recorded move, so the last recorded move is the best one.
+
+    Returns:
+    - list of tuples: Each tuple contains the move and its score, as returned by `application.give_scores`. The move
+      contains the letters on the board before the first placed tile, the placed tiles, the complete word formed,
+      the position of the first placed tile and the direction ('right').
+    """
+    if cross_scores is None:
+        cross_scores = scoring.precompute_cross_scores(board)
+    rack_counts = count_rack(rack)
+    moves = []
+    row, col = anchor
+    # The letters of the row with the placed tiles filled in, shared by the whole search
+    line = list(board[row])
+    extend_gaddag(gaddag, row, col, col, gaddag.root, col, col, 0, 1, 0, rack_counts, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score)
+    return moves
+
+def extend_gaddag(gaddag, row, col, anchor_col, node, first_placed, word_start, main_score, word_multiplier, cross_score, rack, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score):
+    """
+    Tries every letter that can be at a position: the tile that is already there, or each distinct letter on the rack
+    that is allowed by the cross-checks. A blank is tried as every letter that has an edge from the current node and is
+    allowed by the cross-checks, so a blank costs one branch per letter that can actually continue a word. A placed
+    blank is written into the line as a lowercase letter and scores no points.
+
+    Parameters:
+    - gaddag (DAWG): The GADDAG of the lexicon.
+    - row (int): The row the word is built in.
+    - col (int): The column of the current position.
+    - anchor_col (int): The column of the anchor, positions left of it and the anchor itself are part of the reversed prefix.
+    - node (int): Current node in the GADDAG.
+    - first_placed (int): The column of the leftmost placed tile.
+    - word_start (int): The column of the first letter of the word.
+    - main_score (int): The points of the letters of the word so far, with the letter multipliers of the placed letters.
+    - word_multiplier (int): The product of the word multipliers of the squares letters are placed on.
+    - cross_score (int): The scores of the vertical words formed by the placed letters so far.
+    - rack (dict): Remaining letters in the player's rack and their counts, see `count_rack`.
+    - board (list of lists): The board.
+    - line (list of str): The row of the board with the letters placed so far filled in. Letters are written into it
+      and removed again when backtracking, strings are only built when a move is found.
+    - moves (list of tuples): Accumulates valid moves found during recursion.
+    - cross_checks (dict): Contains the bitmask of valid letters for each position for vertical compatibility.
+    - cross_scores (dict): Contains the scores of the vertical words for each letter, for positions below or above tiles.
+    - anchors (set of tuples): All anchor positions on the board.
+    - is_transposed (bool): Whether the board is transposed.
+    - best_score (list of int or None): The best score so far when only better moves are wanted, or None to find all moves.
+
+    Returns:
+    - None: Modifies the moves list in-place by appending valid moves as they are found.
+    """
+    edges = gaddag.edges
+    base = node * gaddag.width
+    letter_index = gaddag.letter_index
+    letter_point = scoring.LETTER_POINT
+    letter_on_board = board[row][col]
+    if letter_on_board != ' ':
+        child = edges[base + letter_index[letter_on_board]]
+        if child:
+            continue_gaddag(gaddag, row, col, anchor_col, child, first_placed, word_start, main_score + letter_point[letter_on_board], word_multiplier, cross_score, rack, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score, False)
+        return
+
+    valid_letters = cross_checks[(row, col)]
+    letter_multiplier = scoring.LETTER_MULTIPLIER[row][col]
+    square_word_multiplier = word_multiplier * scoring.WORD_MULTIPLIER[row][col]
+    cross_word = cross_scores.get((row, col))
+    for letter, count in rack.items():
+        if not count or letter == BLANK:
+            continue
+        index = letter_index[letter]
+        child = edges[base + index]
+        if child and valid_letters >> index & 1:
+            rack[letter] = count - 1
+            line[col] = letter
+            new_cross_score = cross_score + cross_word[index] if cross_word is not None else cross_score
+            continue_gaddag(gaddag, row, col, anchor_col, child, first_placed, word_start, main_score + letter_point[letter] * letter_multiplier, square_word_multiplier, new_cross_score, rack, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score, True)
+            rack[letter] = count
+
+    blanks = rack.get(BLANK)
+    if blanks:
+        rack[BLANK] = blanks - 1
+        # The last cross score is the one of a blank
+        new_cross_score = cross_score + cross_word[-1] if cross_word is not None else cross_score
+        for index in range(len(ALPHABET)):
+            child = edges[base + index]
+            if child and valid_letters >> index & 1:
+                line[col] = BLANK_LETTERS[index]
+                continue_gaddag(gaddag, row, col, anchor_col, child, first_placed, word_start, main_score, square_word_multiplier, new_cross_score, rack, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score, True)
+        rack[BLANK] = blanks
+    line[col] = ' '
+
+def continue_gaddag(gaddag, row, col, anchor_col, node, first_placed, word_start, main_score, word_multiplier, cross_score, rack, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score, is_placed):
+    """
+    Records the move if the word is complete and continues to the next position: further to the left while building
+    the reversed prefix, to the right of the anchor after the separator.
+
+    Parameters:
+    - node (int): The GADDAG node reached with the letter at the current position.
+    - is_placed (bool): Whether the letter at the current position is placed from the rack or was already on the board.
+    - The other parameters are the same as for `extend_gaddag`, with the score including the current position.
+
+    Returns:
+    - None: Modifies the moves list in-place by appending valid moves as they are found.
+    """
+    board_line = board[row]
+    terminal = gaddag.terminal
+    if col <= anchor_col:
+        if is_placed:
+            first_placed = col
+        left_empty = col == 0 or board_line[col - 1] == ' '
+        separator = gaddag.edges[node * gaddag.width + gaddag.letter_index[SEPARATOR]]
+        if left_empty and separator:
+            # The reversed prefix is a whole word if nothing follows on the right of the anchor
+            if terminal[separator >> 3] & (1 << (separator & 7)) and (anchor_col == 14 or board_line[anchor_col + 1] == ' '):
+                record_gaddag_move(row, col, anchor_col, first_placed, main_score * word_multiplier + cross_score, board, line, moves, is_transposed, best_score)
+            if anchor_col < 14:
+                extend_gaddag(gaddag, row, anchor_col + 1, anchor_col, separator, first_placed, col, main_score, word_multiplier, cross_score, rack, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score)
+        # Keep going left through tiles on the board, or onto empty squares that are not anchors themselves
+        if col > 0 and (not left_empty or (row, col - 1) not in anchors):
+            extend_gaddag(gaddag, row, col - 1, anchor_col, node, first_placed, word_start, main_score, word_multiplier, cross_score, rack, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score)
+    else:
+        right_empty = col == 14 or board_line[col + 1] == ' '
+        if right_empty and terminal[node >> 3] & (1 << (node & 7)):
+            record_gaddag_move(row, word_start, col, first_placed, main_score * word_multiplier + cross_score, board, line, moves, is_transposed, best_score)
+        if col < 14:
+            extend_gaddag(gaddag, row, col + 1, anchor_col, node, first_placed, word_start, main_score, word_multiplier, cross_score, rack, board, line, moves, cross_checks, cross_scores, anchors, is_transposed, best_score)
+
+def record_gaddag_move(row, word_start, word_end, first_placed, score, board, line, moves, is_transposed, best_score):
+    """
+    Appends a move found in the GADDAG in the same format as the moves of `generate_word_right`, together with its score.
+
+    Parameters:
+    - row (int): The row of the word.
+    - word_start (int): The column of the first letter of the word.
+    - word_end (int): The column of the last letter of the word.
+    - first_placed (int): The column of the leftmost placed tile.
+    - score (int): The score of the word and the vertical words, without the bonus for placing all letters.
+    - board (list of lists): The board.
+    - line (list of str): The row of the board with the placed letters filled in.
+    - moves (list of tuples): Accumulates valid moves.
+    - is_transposed (bool): Whether the board is transposed.
+    - best_score (list of int or None): When given, the move is only recorded if it beats the best score, which is then raised.
+
+    Returns:
+    - None: Modifies the moves list in-place.
+    """
+    board_line = board[row]
+    placed = ''.join([line[col] for col in range(first_placed, word_end + 1) if board_line[col] == ' '])
+    # A single tile that also forms a vertical word is found again on the other board orientation
+    if is_transposed and len(placed) == 1 and ((row > 0 and board[row - 1][first_placed] != ' ') or (row < 14 and board[row + 1][first_placed] != ' ')):
+        return
+    if len(placed) == 7:
+        score += scoring.BINGO_BONUS
+    if best_score is not None:
+        if score <= best_score[0]:
+            return
+        best_score[0] = score
+    moves.append(((''.join(line[word_start:first_placed]), placed, ''.join(line[word_start:word_end + 1]), (row, first_placed), 'right'), score))
+
+def rack_bound(rack):
+    """
+    Summarises the rack for `anchor_score_bound`, once per turn.
+
+    Parameters:
+    - rack (list of str): The letters on the rack.
+
+    Returns:
+    - tuple: The number of tiles (int), the sums of the n highest letter points for every n (list of int), the bitmask
+      of the letters on the rack (int), the alphabet indexes of the distinct letters (list of int) and whether there is
+      a blank on the rack (bool). A blank fits every square, so with a blank the bitmask holds all letters.
+    """
+    point_sums = [0]
+    for points in sorted((scoring.LETTER_POINT[letter] for letter in rack), reverse=True):
+        point_sums.append(point_sums[-1] + points)
+    has_blank = BLANK in rack
+    rack_indexes = [ALPHABET.index(letter) for letter in dict.fromkeys(rack) if letter != BLANK]
+    rack_mask = ALL_LETTERS_MASK if has_blank else 0
+    for index in rack_indexes:
+        rack_mask |= 1 << index
+    return len(rack), point_sums, rack_mask, rack_indexes, has_blank
+
+def anchor_score_bound(anchor, rack_summary, board, cross_checks, cross_scores, anchors):
+    """
+    Computes an upper bound for the score of the moves through an anchor. Only the squares a move through the anchor
+    can reach are considered: to the left up to the next anchor, on both sides no further than the number of tiles
+    on the rack, and never past a square that none of the rack letters fits on. The highest letter points are paired
+    with the highest letter multipliers, all word multipliers of the squares are applied and the highest vertical
+    word scores are added.
+
+    Parameters:
+    - anchor (tuple): The (row, col) position of the anchor.
+    - rack_summary (tuple): The rack, as summarised by `rack_bound`.
+    - board (list of lists): The board.
+    - cross_checks (dict): The bitmask of valid letters for each empty square.
+    - cross_scores (dict): The scores of the vertical words, see `scoring.precompute_cross_scores`.
+    - anchors (set of tuples): All anchor positions on the board.
+
+    Returns:
+    - int: A score no move through the anchor can exceed.
+    """
+    tiles, point_sums, rack_mask, rack_indexes, has_blank = rack_summary
+    row, anchor_col = anchor
+    line = board[row]
+    letter_point = scoring.LETTER_POINT
+    letter_multipliers = scoring.LETTER_MULTIPLIER[row]
+    word_multipliers = scoring.WORD_MULTIPLIER[row]
+
+    squares = [anchor_col]
+    tile_points = 0
+    for step in (-1, 1):
+        col = anchor_col + step
+        side_squares = 0
+        while 0 <= col < 15:
+            if line[col] != ' ':
+                tile_points += letter_point[line[col]]
+            elif side_squares == tiles - 1 or not cross_checks[(row, col)] & rack_mask or (step == -1 and (row, col) in anchors):
+                break
+            else:
+                squares.append(col)
+                side_squares += 1
+            col += step
+
+    # At most one square per tile can get a letter, the best ones are taken
+    triple_letters = double_letters = triple_words = double_words = 0
+    cross_words = []
+    for col in squares:
+        letter_multiplier = letter_multipliers[col]
+        if letter_multiplier == 3:
+            triple_letters += 1
+        elif letter_multiplier == 2:
+            double_letters += 1
+        word_multiplier = word_multipliers[col]
+        if word_multiplier == 3:
+            triple_words += 1
+        elif word_multiplier == 2:
+            double_words += 1
+        scores = cross_scores.get((row, col))
+        if scores is not None:
+            valid_letters = cross_checks[(row, col)]
+            # A blank scores less than any letter, so it only counts where none of the letters on the rack fits
+            cross_words.append(max([scores[index] for index in rack_indexes if valid_letters >> index & 1], default=scores[-1] if has_blank and valid_letters else 0))
+    placed = min(tiles, len(squares))
+    triple_letters = min(triple_letters, placed)
+    double_letters = min(double_letters, placed - triple_letters)
+    letter_score = point_sums[placed] + 2 * point_sums[triple_letters] + point_sums[triple_letters + double_letters] - point_sums[triple_letters]
+    triple_words = min(triple_words, placed)
+    double_words = min(double_words, placed - triple_words)
+    cross_words.sort(reverse=True)
+
+    bound = (tile_points + letter_score) * 3 ** triple_words * 2 ** double_words + sum(cross_words[:placed])
+    if placed == 7:
+        bound += scoring.BINGO_BONUS
+    return bound
 
 def rack_manager(rack, tile_bag, best_move):
     """
@@ -365,8 +738,10 @@ def rack_manager(rack, tile_bag, best_move):
     """
     initial_part, extended_part, word, anchor, side = best_move
 
-    # Remove letters used in the move from the rack
+    # Remove letters used in the move from the rack, a lowercase letter was played with a blank
     for letter in extended_part:
+        if letter.islower():
+            letter = BLANK
         if letter in rack:
             rack.remove(letter)
 
@@ -386,64 +761,128 @@ def rack_manager(rack, tile_bag, best_move):
 
     return rack
 
-def save_dawg(dawg, filename):
+def read_lexicon(lexicon_path, max_length=MAX_WORD_LENGTH):
+    """
+    Reads the words of a lexicon file one line at a time, so the file is never held in memory. Words with letters
+    outside the alphabet, like accents, hyphens or apostrophes, cannot be played and are skipped.
+
+    Parameters:
+    - lexicon_path (str): The path of the lexicon, one word per line.
+    - max_length (int, default=MAX_WORD_LENGTH): Longer words are skipped.
+
+    Returns:
+    - generator: Yields the words in upper case.
+    """
+    with open(lexicon_path, "r") as file:
+        for line in file:
+            word = line.strip().upper()
+            if word and len(word) <= max_length and word.isascii() and word.isalpha():
+                yield word
+
+def build_fingerprint(lexicon_path=LEXICON_PATH, max_length=MAX_WORD_LENGTH):
     """
-    Saves a Directed Acyclic Word Graph (DAWG) to a file using Python's pickle module.
+    Computes the fingerprint stored in the DAWGs built from a lexicon, see `dawg.lexicon_fingerprint`. DAWGs built
+    with another word length limit get another fingerprint, so they are rebuilt when the limit changes.
 
     Parameters:
-    - dawg (object): The DAWG object.
-    - filename (str): The path and name of the file where the DAWG should be saved.
+    - lexicon_path (str, default=LEXICON_PATH): The path of the lexicon.
+    - max_length (int, default=MAX_WORD_LENGTH): The length of the longest words in the DAWGs.
+
+    Returns:
+    - bytes: The fingerprint.
+    """
+    return lexicon_fingerprint(lexicon_path, f"max_length={max_length}".encode('ascii'))
+
+def build_root(lexicon_path, max_length):
+    # The words are streamed from the lexicon and sorted on disk, the DAWG is minimized while it is built
+    return DAWG.from_sorted_words(external_sort(read_lexicon(lexicon_path, max_length)))
+
+def build_reversed_root(lexicon_path, max_length):
+    return DAWG.from_sorted_words(external_sort(word[::-1] for word in read_lexicon(lexicon_path, max_length)))
+
+def build_gaddag(lexicon_path, max_length):
+    # Every word has an entry for each split, the entries are sorted on disk so they do not all have to fit in memory
+    entries = external_sort(entry for word in read_lexicon(lexicon_path, max_length) for entry in gaddag_entries(word))
+    return DAWG.from_sorted_words(entries, ALPHABET + SEPARATOR)
+
+# The files the lexicon is compiled to and the functions that build them
+LEXICON_STRUCTURES = {
+    'root_dawg.dawg': build_root,
+    'reversed_root_dawg.dawg': build_reversed_root,
+    'gaddag.dawg': build_gaddag,
+}
+
+def build_and_save(name, directory, lexicon_path, max_length, fingerprint):
+    """
+    Builds one of the `LEXICON_STRUCTURES` and saves it, tagged with the fingerprint of the build. Runs in a worker
+    process of `compile_lexicon`.
+
+    Parameters:
+    - name (str): The file name of the structure.
+    - directory (str): The directory of the file.
+    - lexicon_path (str): The path of the lexicon.
+    - max_length (int): The length of the longest words.
+    - fingerprint (bytes): The fingerprint of the build, see `build_fingerprint`.
 
     Returns:
     - None: This function performs file I/O and does not return a value.
     """
-    with open(filename, 'wb') as f:
-        pickle.dump(dawg, f)
+    dawg = LEXICON_STRUCTURES[name](lexicon_path, max_length)
+    dawg.fingerprint = fingerprint
+    dawg.save(os.path.join(directory, name))
 
-def load_dawg(filename):
+def compile_lexicon(names=tuple(LEXICON_STRUCTURES), directory='DAWG', lexicon_path=LEXICON_PATH, max_length=MAX_WORD_LENGTH, workers=None):
     """
-    Loads a Directed Acyclic Word Graph (DAWG) from a file using Python's pickle module.
+    Builds the structures of a lexicon whose files are missing or carry another fingerprint than the one of this build,
+    the others are left as they are. The structures are independent, so each one is built in its own process. Every
+    file is written to a temporary file and renamed when it is complete, see `DAWG.save`.
 
     Parameters:
-    - filename (str): The path and name of the file from which the DAWG should be loaded.
+    - names (tuple of str, default=all): The file names of the structures, keys of `LEXICON_STRUCTURES`.
+    - directory (str, default='DAWG'): The directory of the files.
+    - lexicon_path (str, default=LEXICON_PATH): The path of the lexicon.
+    - max_length (int, default=MAX_WORD_LENGTH): The length of the longest words.
+    - workers (int, optional): The maximum number of processes, the number of CPUs when not given.
 
     Returns:
-    - object: The deserialized DAWG object loaded from the specified file.
-    """
-    with open(filename, 'rb') as f:
-        return pickle.load(f)
-    
-def make_and_save_DAWG_reversed_DAWG():
-    # Initialize roots
-    root = create_node()
-    reversed_root = create_node()
-
-    # Read lexicon file
-    with open("lexicon/Collins Scrabble Words (2019).txt", "r") as file:
-        list_to_add_to_DAWG = file.readlines()
-
-    # Insert words and their reversed versions into DAWGs
-    for word in list_to_add_to_DAWG:
-        if len(word) <= 9:
-            word = word.strip("\n")
-            word = word.upper()
-            insert(root, word)
-            reversed_word = reversed(word)
-            insert(reversed_root, reversed_word)
-
-    # Minimize the DAWGs to reduce redundancy and save memory
-    minimize(root)
-    minimize(reversed_root)
-
-    # Save the DAWGs to files
-    save_dawg(root, 'DAWG/root_dawg.pkl')
-    save_dawg(reversed_root, 'DAWG/reversed_root_dawg.pkl')
-
-    file.close()
+    - list of str: The names of the structures that were built.
+    """
+    fingerprint = build_fingerprint(lexicon_path, max_length)
+    stale = [name for name in names if read_fingerprint(os.path.join(directory, name)) != fingerprint]
+    workers = min(len(stale), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        for name in stale:
+            build_and_save(name, directory, lexicon_path, max_length, fingerprint)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            jobs = [pool.submit(build_and_save, name, directory, lexicon_path, max_length, fingerprint) for name in stale]
+            for job in jobs:
+                job.result()
+    return stale
+
+def make_and_save_DAWG_reversed_DAWG(lexicon_path=LEXICON_PATH, max_length=MAX_WORD_LENGTH):
+    # Build the DAWG and the reversed DAWG side by side, if the lexicon changed since they were last built
+    compile_lexicon(('root_dawg.dawg', 'reversed_root_dawg.dawg'), 'DAWG', lexicon_path, max_length)
+
+def make_and_save_GADDAG(lexicon_path=LEXICON_PATH, max_length=MAX_WORD_LENGTH):
+    compile_lexicon(('gaddag.dawg',), 'DAWG', lexicon_path, max_length)
+
+def load_DAWG_GADDAG():
+    # The DAWG is used for the cross-checks, the GADDAG for move generation. They are built from the lexicon if they
+    # are missing or were built from another lexicon or with another word length limit
+    compile_lexicon(('root_dawg.dawg', 'gaddag.dawg'))
+
+    root = DAWG.load('DAWG/root_dawg.dawg')
+    gaddag = DAWG.load('DAWG/gaddag.dawg')
+
+    return root, gaddag
 
 def load_DAWG_reversed_DAWG():
-    # # Load the root and reversed_root 
-    root = load_dawg('DAWG/root_dawg.pkl')
-    reversed_root = load_dawg('DAWG/reversed_root_dawg.pkl')
+    # Build the DAWGs from the lexicon if they are missing or out of date, like `load_DAWG_GADDAG`
+    compile_lexicon(('root_dawg.dawg', 'reversed_root_dawg.dawg'))
+
+    # Memory-map the root and reversed_root
+    root = DAWG.load('DAWG/root_dawg.dawg')
+    reversed_root = DAWG.load('DAWG/reversed_root_dawg.dawg')
 
-    return root, reversed_root
\ No newline at end of file
+    return root, reversed_root
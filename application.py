@@ -1,8 +1,12 @@
+import heapq
 import random
 import colorama
 colorama.init(autoreset=True)
 from colorama import Fore, Back, Style
 import algorithm
+import scoring
+from board import Board
+from dawg import BLANK
 
 def transpose_board_counterclockwise(board):
     """
@@ -30,6 +34,36 @@ def transpose_board_clockwise(board):
     transposed_board = [[board[j][i] for j in range(len(board)-1, -1, -1)] for i in range(len(board[0]))]
     return transposed_board
 
+def transpose_board(board):
+    """
+    Transposes a 2D board array, so columns become rows. Unlike the rotations, words keep their reading direction:
+    vertical words read from top to bottom become horizontal words read from left to right, and the other way around.
+    Transposing twice gives the original board back.
+
+    Parameters:
+    - board (list of lists): A 2D list representing a board where each sublist is a row.
+
+    Returns:
+    - list of lists: The transposed board.
+    """
+    return [list(column) for column in zip(*board)]
+
+def board_view(board, is_transposed):
+    """
+    Returns the board as it is read for horizontal moves, or transposed for vertical moves. A `Board` returns its
+    column view without copying, a plain list of lists is transposed.
+
+    Parameters:
+    - board (Board or list of lists): The board.
+    - is_transposed (bool): Whether the transposed board is needed.
+
+    Returns:
+    - list of lists: The board or the transposed board.
+    """
+    if isinstance(board, Board):
+        return board.view(is_transposed)
+    return transpose_board(board) if is_transposed else board
+
 def game_scores():
     """
     Defines the point values for each letter used in the game and the score multipliers for specific board positions.
@@ -41,35 +75,7 @@ def game_scores():
           indicating special scoring tiles on the board ('2L' for double letter score, '3L' for triple letter score, 
           '2W' for double word score, and '3W' for triple word score).
     """
-    letter_point = {
-                    "A": 1, "B": 4, "C": 5, "D": 2,
-                    "E": 1, "F": 4, "G": 3, "H": 4,
-                    "I": 2, "J": 4, "K": 3, "L": 3,
-                    "M": 3, "N": 1, "O": 1, "P": 4,
-                    "Q": 10, "R": 2, "S": 2, "T": 2,
-                    "U": 2, "V": 4, "W": 5, "X": 8,
-                    "Y": 8, "Z": 5
-                }
-    
-    square_multiplier = { 
-                    (0, 0): '3L', (0, 1): '', (0, 2): '', (0, 3): '', (0, 4): '3W', (0, 5): '', (0, 6): '', (0, 7): '2L', (0, 8): '', (0, 9): '', (0, 10): '3W', (0, 11): '', (0, 12): '', (0, 13): '', (0, 14): '3L', 
-                    (1, 0): '', (1, 1): '2L', (1, 2): '', (1, 3): '', (1, 4): '', (1, 5): '3L', (1, 6): '', (1, 7): '', (1, 8): '', (1, 9): '3L', (1, 10): '', (1, 11): '', (1, 12): '', (1, 13): '2L', (1, 14): '', 
-                    (2, 0): '', (2, 1): '', (2, 2): '2W', (2, 3): '', (2, 4): '', (2, 5): '', (2, 6): '2L', (2, 7): '', (2, 8): '2L', (2, 9): '', (2, 10): '', (2, 11): '', (2, 12): '2W', (2, 13): '', (2, 14): '', 
-                    (3, 0): '', (3, 1): '', (3, 2): '', (3, 3): '3L', (3, 4): '', (3, 5): '', (3, 6): '', (3, 7): '2W', (3, 8): '', (3, 9): '', (3, 10): '', (3, 11): '3L', (3, 12): '', (3, 13): '', (3, 14): '', 
-                    (4, 0): '3W', (4, 1): '', (4, 2): '', (4, 3): '', (4, 4): '2W', (4, 5): '', (4, 6): '2L', (4, 7): '', (4, 8): '2L', (4, 9): '', (4, 10): '2W', (4, 11): '', (4, 12): '', (4, 13): '', (4, 14): '3W', 
-                    (5, 0): '', (5, 1): '3L', (5, 2): '', (5, 3): '', (5, 4): '', (5, 5): '3L', (5, 6): '', (5, 7): '', (5, 8): '', (5, 9): '3L', (5, 10): '', (5, 11): '', (5, 12): '', (5, 13): '3L', (5, 14): '', 
-                    (6, 0): '', (6, 1): '', (6, 2): '2L', (6, 3): '', (6, 4): '2L', (6, 5): '', (6, 6): '', (6, 7): '', (6, 8): '', (6, 9): '', (6, 10): '2L', (6, 11): '', (6, 12): '2L', (6, 13): '', (6, 14): '', 
-                    (7, 0): '2L', (7, 1): '', (7, 2): '', (7, 3): '2W', (7, 4): '', (7, 5): '', (7, 6): '', (7, 7): '', (7, 8): '', (7, 9): '', (7, 10): '', (7, 11): '2W', (7, 12): '', (7, 13): '', (7, 14): '2L', 
-                    (8, 0): '', (8, 1): '', (8, 2): '2L', (8, 3): '', (8, 4): '2L', (8, 5): '', (8, 6): '', (8, 7): '', (8, 8): '', (8, 9): '', (8, 10): '2L', (8, 11): '', (8, 12): '2L', (8, 13): '', (8, 14): '', 
-                    (9, 0): '', (9, 1): '3L', (9, 2): '', (9, 3): '', (9, 4): '', (9, 5): '3L', (9, 6): '', (9, 7): '', (9, 8): '', (9, 9): '3L', (9, 10): '', (9, 11): '', (9, 12): '', (9, 13): '3L', (9, 14): '', 
-                    (10, 0): '3W', (10, 1): '', (10, 2): '', (10, 3): '', (10, 4): '2W', (10, 5): '', (10, 6): '2L', (10, 7): '', (10, 8): '2L', (10, 9): '', (10, 10): '2W', (10, 11): '', (10, 12): '', (10, 13): '', (10, 14): '3W', 
-                    (11, 0): '', (11, 1): '', (11, 2): '', (11, 3): '3L', (11, 4): '', (11, 5): '', (11, 6): '', (11, 7): '2W', (11, 8): '', (11, 9): '', (11, 10): '', (11, 11): '3L', (11, 12): '', (11, 13): '', (11, 14): '', 
-                    (12, 0): '', (12, 1): '', (12, 2): '2W', (12, 3): '', (12, 4): '', (12, 5): '', (12, 6): '2L', (12, 7): '', (12, 8): '2L', (12, 9): '', (12, 10): '', (12, 11): '', (12, 12): '2W', (12, 13): '', (12, 14): '', 
-                    (13, 0): '', (13, 1): '2L', (13, 2): '', (13, 3): '', (13, 4): '', (13, 5): '3L', (13, 6): '', (13, 7): '', (13, 8): '', (13, 9): '3L', (13, 10): '', (13, 11): '', (13, 12): '', (13, 13): '2L', (13, 14): '', 
-                    (14, 0): '3L', (14, 1): '', (14, 2): '', (14, 3): '', (14, 4): '3W', (14, 5): '', (14, 6): '', (14, 7): '2L', (14, 8): '', (14, 9): '', (14, 10): '3W', (14, 11): '', (14, 12): '', (14, 13): '', (14, 14): '3L' 
-                    }
-    
-    return letter_point, square_multiplier
+    return dict(scoring.LETTER_POINT), dict(scoring.SQUARE_MULTIPLIER)
 
 def get_color(multiplier):
     if multiplier == '3L':
@@ -92,7 +98,7 @@ def print_board_with_colors(board, square_multiplier):
             print(color + f"{tile:^3}", end='')
         print()
 
-def give_scores(move):
+def give_scores(move, board=None):
     """
     Calculates the total score for a move based on the letters used, their positions, and the multipliers applicable to those positions.
 
@@ -100,147 +106,153 @@ def give_scores(move):
     - move (tuple): A tuple representing a move, structured as (initial_part, extended_part, word, anchor, side).
                     Here, 'word' is the complete word formed, 'anchor' is the starting position (tuple of row and col),
                     and 'side' indicates the direction ('left' or 'right').
+    - board (list of lists, optional): The board before the move is placed. When given, the letters of a 'right' move
+                    skip the tiles already on the board, as they do in `update_board_with_best_move`, and the words
+                    formed in the other direction are scored too.
 
     Returns:
     - tuple: A tuple containing the original move and its calculated total score (int).
     """
-    initial_part, extended_part, word, anchor, side = move
-    letter_point, square_multiplier = game_scores()
-
-    word_score = 0
-    multiplier_letter_score = 0
-    multiplier_word_score = 0
+    return move, scoring.score_move(move, board)
 
-    start_row, start_col = anchor
-    
-    # Give points for letters in word
-    for char in word:
-        score = letter_point.get(char)
-        word_score += score
-
-    # Give points for multipliers
-    if side == 'left':
-        for i in range(len(extended_part)):
-            col = start_col - i
-            multiplier = square_multiplier.get((start_row, col))
-            for char in extended_part[len(extended_part) - i - 1]:
-                if multiplier == '2L':
-                    score = letter_point.get(char)
-                    multiplier_letter_score += score
-                elif multiplier == '3L':
-                    score = letter_point.get(char)
-                    multiplier_word_score += score * 2
-                elif multiplier == '2W':
-                    multiplier_word_score += word_score
-                elif multiplier == '3W':
-                    multiplier_word_score += word_score * 2
-
-    if side == 'right':
-        for i in range(len(extended_part)):
-            col = start_col + i
-            multiplier = square_multiplier.get((start_row, col))
-            for char in extended_part[i]:
-                if multiplier == '2L':
-                    score = letter_point.get(char)
-                    multiplier_letter_score += score
-                elif multiplier == '3L':
-                    score = letter_point.get(char)
-                    multiplier_word_score += score * 2
-                elif multiplier == '2W':
-                    multiplier_word_score += word_score
-                elif multiplier == '3W':
-                    multiplier_word_score += word_score * 2
-
-    total_score = word_score + multiplier_letter_score + multiplier_word_score
-
-    # Bonus points for using all rack letters
-    if len(extended_part) == 7:
-        total_score += 40
-
-    return move, total_score
-
-def get_best_move(all_scores, amount_of_best_moves):
+def placement_key(move, is_transposed, board=None):
     """
-    Selects the best move from a list of scored moves, potentially picking randomly among ties for the highest score.
+    Identifies where a move places which letters, so the same placement found from different anchors or generators
+    counts once.
 
     Parameters:
-    - all_scores (list of tuples): A list where each tuple contains a move's details and its score. 
-      The structure is ((move_details, score), is_transposed).
+    - move (tuple): The move, structured as (initial_part, extended_part, word, anchor, side).
+    - is_transposed (bool): Whether the move was found on the transposed board.
+    - board (list of lists, optional): The board before the move is placed. When given, the key holds the squares the
+      letters are placed on, otherwise the position, direction and letters of the move.
 
     Returns:
-    - tuple: The best move tuple containing the move's details and whether the board was transposed for this move.
+    - tuple: A hashable key that is equal for moves that place the same letters on the same squares.
     """
-    # (move, score), is_transposed = all_scores
-    # best_move_initial_part, best_move_extended_part, best_move_word, best_move_anchor, best_move_side = move
-    if not all_scores:
-        return []
+    if board is not None:
+        return tuple(sorted(zip(get_placed_cells(board, move, is_transposed), move[1] if move[4] == 'right' else move[1][::-1])))
+    return is_transposed, move[3], move[1], move[4]
 
-    unique_moves = []
-    seen_words = set()
-
-    # Determine the highest score from all evaluated moves
-    sorted_moves = sorted(all_scores, key=lambda score: score[0][1], reverse=True)
-    # Needed to determine unique moves to retun as possible moves. Since all moves get added to all_scores which are transposed etc or not.
-    if amount_of_best_moves > 1 and amount_of_best_moves < len(sorted_moves):
-        for move in sorted_moves:
-            best_move_word = move[0][0][2]
-            best_move_side = move[0][0][4]
-            if best_move_side == 'left':
-                best_move_word = ''.join(reversed(best_move_word))
-            if best_move_word not in seen_words:
-                seen_words.add(best_move_word)
-                unique_moves.append(move)
-                if len(unique_moves) == amount_of_best_moves:
-                    break
-        return unique_moves
-    else:
-        best_move = sorted_moves
+def get_best_move(all_scores, amount_of_best_moves, board=None):
+    """
+    Selects the best scoring moves while the moves are streamed, keeping a heap of at most amount_of_best_moves
+    unique placements. Among moves with the same score the one found first is preferred.
 
-    return best_move
+    Parameters:
+    - all_scores (iterable of tuples): The scored moves, each structured as ((move_details, score), is_transposed).
+    - amount_of_best_moves (int): The number of moves to select.
+    - board (list of lists, optional): The board before the move is placed, used to recognise the same placement, see `placement_key`.
 
-def update_board_with_best_move(board, best_move):
+    Returns:
+    - list of tuples: At most amount_of_best_moves scored moves with different placements, best first, empty if
+      amount_of_best_moves is not positive.
+    """
+    if amount_of_best_moves <= 0:
+        return []
+    best_moves = []
+    placements = set()
+    for order, scored_move in enumerate(all_scores):
+        (move, score), is_transposed = scored_move
+        # Later moves with the same score rank lower, like in a stable sort
+        rank = (score, -order)
+        if len(best_moves) == amount_of_best_moves and rank <= best_moves[0][0]:
+            continue
+        key = placement_key(move, is_transposed, board)
+        # A placement found again has the same score, so it can only be a duplicate of a move in the heap
+        if key in placements:
+            continue
+        placements.add(key)
+        if len(best_moves) < amount_of_best_moves:
+            heapq.heappush(best_moves, (rank, key, scored_move))
+        else:
+            removed_rank, removed_key, removed_move = heapq.heapreplace(best_moves, (rank, key, scored_move))
+            placements.discard(removed_key)
+
+    return [scored_move for rank, key, scored_move in sorted(best_moves, reverse=True)]
+
+def update_board_with_best_move(board, best_move, is_transposed=False, anchor_state=None):
     """
     Updates the board with letters from the best move determined by game logic.
 
     Parameters:
-    - board (list of lists): The board represented as a 15x15 grid of characters.
+    - board (Board or list of lists): The board represented as a 15x15 grid of characters, a Board keeps its column view in sync.
     - best_move (tuple): A tuple representing the best move, structured as (initial_part, extended_part, word, anchor, side),
                          where 'anchor' is the (row, col) starting position and 'side' indicates the direction of the word ('left' or 'right').
+    - is_transposed (bool, default=False): Whether the move was found on the transposed board. The move is placed on
+                         the board as it is, without transposing it.
+    - anchor_state (dict, optional): The anchors of the board, see `initialize_anchor_state`, which are updated for the placed letters.
 
     Returns:
     - list of lists: The updated board with the new word added.
     """
     initial_part, extended_part, word, anchor, side = best_move
 
-    start_row, start_col = anchor
-
-    extended_index = 0
-
-    # Place letters on the board depending on the direction of the move
+    # If placing leftwards, reverse the extended part to match the order in which the squares are found
     if side == 'left':
-        # If placing leftwards, reverse the extended part to match the board's orientation
-        distance_to_edge_left = start_col
         extended_part = ''.join(reversed(extended_part))
-        for i in range(distance_to_edge_left):
-            col = start_col - i
-            # Ensure no overwriting of existing letters
-            if board[start_row][col] == ' ' and extended_index < len(extended_part):
-                board[start_row][col] = extended_part[extended_index]
-                extended_index += 1
-    else:
-        distance_to_edge_right = 15 - start_col
-        for i in range(distance_to_edge_right):
-            col = start_col + i
-            # Ensure no overwriting of existing letters
-            if board[start_row][col] == ' ' and extended_index < len(extended_part):
-                board[start_row][col] = extended_part[extended_index]
-                extended_index += 1
+
+    # Place letters on the empty squares only, so no existing letters are overwritten
+    placed_cells = get_placed_cells(board, best_move, is_transposed)
+    for (row, col), letter in zip(placed_cells, extended_part):
+        if isinstance(board, Board):
+            board.place(row, col, letter)
+        else:
+            board[row][col] = letter
+
+    if anchor_state is not None:
+        algorithm.update_anchor_positions(anchor_state, board, placed_cells)
 
     return board
 
+def get_placed_cells(board, best_move, is_transposed=False):
+    """
+    Determines the squares a move places its letters on, in the same way `update_board_with_best_move` places them.
+
+    Parameters:
+    - board (list of lists): The board before the move is placed.
+    - best_move (tuple): A tuple representing the move, structured as (initial_part, extended_part, word, anchor, side).
+    - is_transposed (bool, default=False): Whether the move was found on the transposed board, the board itself is not transposed.
+
+    Returns:
+    - list of tuples: The (row, col) positions on the board of the placed letters.
+    """
+    initial_part, extended_part, word, anchor, side = best_move
+    row, col = anchor
+    step = -1 if side == 'left' else 1
+    placed_cells = []
+    while len(placed_cells) < len(extended_part) and 0 <= col < 15:
+        cell = (col, row) if is_transposed else (row, col)
+        if board[cell[0]][cell[1]] == ' ':
+            placed_cells.append(cell)
+        col += step
+    return placed_cells
+
+def initialize_cross_check_state(root, board):
+    # Cross-checks for the normal (False) and the transposed (True) board, kept up to date during the game
+    return {False: algorithm.precompute_cross_checks(root, board), True: algorithm.precompute_cross_checks(root, board_view(board, True))}
+
+def initialize_cross_score_state(board):
+    # Scores of the vertical words for the normal (False) and the transposed (True) board, kept up to date like the cross-checks
+    return {False: scoring.precompute_cross_scores(board), True: scoring.precompute_cross_scores(board_view(board, True))}
+
+def update_cross_score_state(board, cross_score_state, placed_cells):
+    scoring.update_cross_scores(board, cross_score_state[False], placed_cells)
+    scoring.update_cross_scores(board_view(board, True), cross_score_state[True], [(col, row) for row, col in placed_cells])
+    return cross_score_state
+
+def update_cross_check_state(root, board, cross_check_state, placed_cells):
+    algorithm.update_cross_checks(root, board, cross_check_state[False], placed_cells)
+    algorithm.update_cross_checks(root, board_view(board, True), cross_check_state[True], [(col, row) for row, col in placed_cells])
+    return cross_check_state
+
+def initialize_anchor_state(board):
+    # Anchors for the normal (False) and the transposed (True) board, kept up to date by update_board_with_best_move
+    anchors = set(algorithm.find_anchor_positions(board))
+    return {False: anchors, True: {(col, row) for row, col in anchors}}
+
 def initialize_game_board():
-    # Create an empty board
-    board = [[' ' for _ in range(15)] for _ in range(15)]
+    # Create an empty board, with a column view for the vertical moves
+    board = Board()
 
     return board
 
@@ -249,7 +261,7 @@ def initialize_game_tile_bag():
     tile_bag = ["A"] * 7 + ["B"] * 2 + ["C"] * 2 + ["D"] * 5 + ["E"] * 18 + ["F"] * 2 + ["G"] * 3 + \
                 ["H"] * 2 + ["I"] * 4 + ["J"] * 2 + ["K"] * 3 + ["L"] * 3 + ["M"] * 3 + ["N"] * 11 + \
                 ["O"] * 6 + ["P"] * 2 + ["Q"] * 1 + ["R"] * 5 + ["S"] * 5 + ["T"] * 5 + ["U"] * 2 + \
-                ["V"] * 2 + ["W"] * 2 + ["X"] * 1 + ["Y"] * 1 + ["Z"] * 2
+                ["V"] * 2 + ["W"] * 2 + ["X"] * 1 + ["Y"] * 1 + ["Z"] * 2 + [BLANK] * 2
 
     return tile_bag
 
@@ -264,37 +276,125 @@ def initialize_game_rack(tile_bag):
 
     return rack_player1, rack_player2, tile_bag
 
-def move_generation(board, root, reversed_root, current_rack):
+def generate_moves(board, root, gaddag, current_rack, cross_check_state=None, anchor_state=None, cross_score_state=None):
+    """
+    Yields the possible moves one anchor at a time, so a consumer can stop early or keep only the moves it needs
+    instead of holding every move of the turn in memory. The moves are scored while they are generated, including
+    the words formed in the other direction.
+
+    Parameters:
+    - board (Board or list of lists): The board.
+    - root (DAWG): The DAWG of the lexicon, used for the cross-checks when no cross_check_state is given.
+    - gaddag (DAWG): The GADDAG of the lexicon.
+    - current_rack (list of str): The letters on the rack.
+    - cross_check_state (dict, optional): The cross-checks of both orientations, see `initialize_cross_check_state`.
+    - anchor_state (dict, optional): The anchors of both orientations, see `initialize_anchor_state`.
+    - cross_score_state (dict, optional): The scores of the cross words of both orientations, see `initialize_cross_score_state`.
+
+    Returns:
+    - generator: Yields ((move, score), is_transposed) tuples, like `moves_score_is_transposed`.
+    """
+    if cross_check_state is None:
+        cross_check_state = initialize_cross_check_state(root, board)
+    if anchor_state is None:
+        anchor_state = initialize_anchor_state(board)
+    if cross_score_state is None:
+        cross_score_state = initialize_cross_score_state(board)
+
     # non transposed and transposed state
-    board_states = [(board, False), (transpose_board_counterclockwise(board), True)]
-
-    # Loops through the board states and adds all possible moves to the all_moves list
-    all_moves = []
-    for current_board, is_transposed in board_states:
-        anchor_positions = algorithm.find_anchor_positions(current_board)
-        cross_checks = algorithm.precompute_cross_checks(root, current_board)
-        for anchor in anchor_positions:
-            moves_right = algorithm.generate_word_right(anchor, current_rack, current_board, cross_checks, root)
-            moves_left = algorithm.generate_word_left(anchor, current_rack, current_board, cross_checks, reversed_root)
-            all_moves.extend([(move, is_transposed) for move in moves_right])
-            all_moves.extend([(move, is_transposed) for move in moves_left]) 
-
-    return all_moves
-
-def moves_score_is_transposed(all_moves):
-    all_scores = []
+    for is_transposed in (False, True):
+        current_board = board_view(board, is_transposed)
+        anchors = anchor_state[is_transposed]
+        cross_checks = cross_check_state[is_transposed]
+        cross_scores = cross_score_state[is_transposed]
+        for anchor in sorted(anchors):
+            for move_with_total_score in algorithm.generate_word_gaddag(anchor, current_rack, current_board, cross_checks, gaddag, anchors, is_transposed, cross_scores):
+                yield move_with_total_score, is_transposed
+
+def find_best_move(board, root, gaddag, current_rack, cross_check_state=None, anchor_state=None, cross_score_state=None):
+    """
+    Finds the highest scoring move without generating every move. An upper bound of the score is computed for every
+    anchor and the anchors are searched from the highest bound down, until no remaining anchor can beat the best move
+    found. Among moves with the same score the one `generate_moves` yields first is returned, the same move
+    `get_best_move` selects.
+
+    Parameters:
+    - The parameters are the same as for `generate_moves`.
+
+    Returns:
+    - tuple or None: The best move as ((move, score), is_transposed), or None if there are no moves.
+    """
+    if cross_check_state is None:
+        cross_check_state = initialize_cross_check_state(root, board)
+    if anchor_state is None:
+        anchor_state = initialize_anchor_state(board)
+    if cross_score_state is None:
+        cross_score_state = initialize_cross_score_state(board)
+
+    rack_summary = algorithm.rack_bound(current_rack)
+    anchor_bounds = []
+    for is_transposed in (False, True):
+        current_board = board_view(board, is_transposed)
+        anchors = anchor_state[is_transposed]
+        cross_checks = cross_check_state[is_transposed]
+        cross_scores = cross_score_state[is_transposed]
+        for order, anchor in enumerate(sorted(anchors)):
+            bound = algorithm.anchor_score_bound(anchor, rack_summary, current_board, cross_checks, cross_scores, anchors)
+            anchor_bounds.append((bound, (is_transposed, order), anchor))
+    anchor_bounds.sort(key=lambda anchor_bound: anchor_bound[0], reverse=True)
+
+    best_move = None
+    best_score = -1
+    best_order = None
+    for bound, order, anchor in anchor_bounds:
+        if bound < best_score:
+            break
+        # An anchor searched earlier by generate_moves wins a tie, a later one has to beat the best score
+        must_beat = best_score if best_order is None or order > best_order else best_score - 1
+        if bound <= must_beat:
+            continue
+        is_transposed = order[0]
+        anchors = anchor_state[is_transposed]
+        threshold = [must_beat]
+        moves = algorithm.generate_word_gaddag(anchor, current_rack, board_view(board, is_transposed), cross_check_state[is_transposed], gaddag, anchors, is_transposed, cross_score_state[is_transposed], threshold)
+        if moves:
+            best_move = (moves[-1], is_transposed)
+            best_score = threshold[0]
+            best_order = order
+    return best_move
+
+def move_generation(board, root, gaddag, current_rack, cross_check_state=None, anchor_state=None, cross_score_state=None):
+    # Collects all possible moves of both board states in the all_moves list, without their scores
+    return [(move, is_transposed) for (move, score), is_transposed in generate_moves(board, root, gaddag, current_rack, cross_check_state, anchor_state, cross_score_state)]
+
+def score_moves(all_moves, board=None):
+    """
+    Scores moves one at a time as they are taken from an iterable of moves, such as `move_generation`.
+
+    Parameters:
+    - all_moves (iterable of tuples): The (move, is_transposed) tuples to score.
+    - board (Board or list of lists, optional): The board, needed to score moves that are played through tiles on the board.
+
+    Returns:
+    - generator: Yields ((move, score), is_transposed) tuples.
+    """
+    board_states = {False: board, True: board_view(board, True) if board is not None else None}
     for move, is_transposed in all_moves:
-        move_with_total_score = give_scores(move)
-        all_scores.append((move_with_total_score, is_transposed))
-    return all_scores
+        yield give_scores(move, board_states[is_transposed]), is_transposed
+
+def moves_score_is_transposed(all_moves, board=None):
+    # The board is needed to score moves that are played through tiles on the board
+    return list(score_moves(all_moves, board))
 
 def helper(board, square_multiplier, selected_algorithm, all_scores):
     print_board_with_colors(board, square_multiplier)
     amount_of_best_moves = int(input("How many best moves should it give: "))
     if selected_algorithm == 'greedy':
-        best_scoring_move = get_best_move(all_scores, amount_of_best_moves) # Use this for the greedy algorithm
+        best_scoring_move = get_best_move(all_scores, amount_of_best_moves, board) # Use this for the greedy algorithm
     if selected_algorithm == 'random':
         best_scoring_move = random.sample(all_scores, amount_of_best_moves) # Use this for random algorithm
+    if selected_algorithm in ('simulate', 'equity'):
+        best_scoring_move = all_scores[:amount_of_best_moves] # The moves are already ranked by montecarlo.rank_moves or by equity
     print(best_scoring_move)
     moves_range = min(amount_of_best_moves, len(best_scoring_move))
     
@@ -340,7 +440,7 @@ def computer(selected_algorithm, all_scores):
     if selected_algorithm == 'greedy':
         best_scoring_move = get_best_move(all_scores, amount_of_best_moves)[0] # Use this for the greedy algorithm
     if selected_algorithm == 'random':      
-        best_scoring_move = random.choice(all_scores) # Use this for random algorithm
+        best_scoring_move = random.choice(list(all_scores)) # Use this for random algorithm
     print(f"Best scoring move: {best_scoring_move}")
 
     # Unpack the best move for further use and statistics
@@ -348,41 +448,3 @@ def computer(selected_algorithm, all_scores):
     best_move_initial_part, best_move_extended_part, best_move_word, best_move_anchor, best_move_side = best_move
 
     return best_move, best_move_word, best_move_score, best_move_side, best_move_is_transposed
-
-def place_move_print_board_player_management(board, best_move_is_transposed, best_move, best_move_word, square_multiplier, best_move_score, best_move_side, tile_bag, player1_total_score, player1_list_of_moves, player2_total_score, player2_list_of_moves, rack_player1, rack_player2, current_rack, current_player):    
-    # Places a transposed move on the board
-    if best_move_is_transposed:
-        transposed_board = transpose_board_counterclockwise(board)
-        transposed_board = update_board_with_best_move(transposed_board, best_move)
-        board = transpose_board_clockwise(transposed_board)
-
-    else:
-        board = update_board_with_best_move(board, best_move)
-
-    print_board_with_colors(board, square_multiplier)
-
-    # Reverse the word from the reversed dawg for better readability
-    if best_move_side == 'left':
-        best_move_word = ''.join(reversed(best_move_word))
-        
-    if current_player == 1:
-        player1_total_score += best_move_score
-        player1_list_of_moves.append(best_move_word)
-        print(f"Player1 score: {best_move_score}")
-        print(f"Player1 total score: {player1_total_score}")
-        print(f"Player1 word played: {best_move_word}")
-        rack_player1 = algorithm.rack_manager(rack_player1, tile_bag, best_move)
-        current_player = 2
-        current_rack = rack_player2
-    else:
-        player2_total_score += best_move_score
-        player2_list_of_moves.append(best_move_word)
-        print(f"Player2 score: {best_move_score}")
-        print(f"Player2 total score: {player2_total_score}")
-        print(f"Player2 word played: {best_move_word}")
-        rack_player2 = algorithm.rack_manager(rack_player2, tile_bag, best_move)
-        current_player = 1
-        current_rack = rack_player1
-    print('---------------------------------------------')
-
-    return board, tile_bag, player1_total_score, player1_list_of_moves, player2_total_score, player2_list_of_moves, current_rack, current_player
\ No newline at end of file
@@ -0,0 +1,123 @@
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+import algorithm
+from dawg import BLANK
+from game import Game
+
+# Budgets on one core for the full 15 letter lexicon. Move generation is timed per turn over greedy self-play games.
+GENERATE_MOVES_BUDGET_MS = 15
+BEST_MOVE_BUDGET_MS = 15
+LEXICON_MEMORY_BUDGET_MB = 100
+PROCESS_MEMORY_BUDGET_MB = 150
+
+# How many times longer move generation may take per move found when two tiles of the rack are blanks. A blank only
+# branches on the letters that have an edge from the current GADDAG node and pass the cross-check of the square, and
+# every edge of the GADDAG leads on to a word, so the search does about the same work for every move it finds as
+# without blanks. How many more moves there are depends on the board and the lexicon, not on the code: two blanks
+# give about 90 times as many moves. The greedy player takes the best of all moves, so both are budgeted per move
+TWO_BLANKS_COST_PER_MOVE_MULTIPLE = 1.5
+TWO_BLANKS_BEST_MOVE_COST_PER_MOVE_MULTIPLE = 1.5
+
+def percentile(values, fraction):
+    # The value below which the given fraction of the sorted values lies
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def benchmark(games=20, seed=0):
+    """
+    Plays greedy self-play games and times the move generation of every turn: generating all moves, as the helper and
+    the random player do, and finding the best move, as the greedy player does. Both are timed again with the last two
+    tiles of the rack replaced by blanks, on turns where the rack holds no blank and at least two tiles.
+
+    Parameters:
+    - games (int, default=20): The number of games.
+    - seed (int, default=0): The seed of the first game.
+
+    Returns:
+    - dict: The mean and 95th percentile of both timings in milliseconds, how many times longer they take with two
+      blanks in total and per move found and how many times as many moves there are, the size of the memory-mapped
+      lexicon and the peak memory of the process in MB.
+    """
+    root, gaddag = algorithm.load_DAWG_GADDAG()
+    generate_times = []
+    best_move_times = []
+    # (without blanks, with two blanks) for the turns that are timed both ways
+    blank_generate_times = []
+    blank_move_counts = []
+    blank_best_move_times = []
+    for game_number in range(games):
+        random.seed(seed + game_number)
+        game = Game(root, gaddag)
+        while not game.is_over():
+            start = time.perf_counter()
+            move_count = sum(1 for scored_move in game.legal_moves())
+            generate_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            best_move = game.best_move()
+            best_move_times.append(time.perf_counter() - start)
+
+            rack = game.rack
+            if len(rack) >= 2 and BLANK not in rack:
+                game.racks[game.current_player] = rack[:-2] + [BLANK, BLANK]
+                start = time.perf_counter()
+                blank_move_count = sum(1 for scored_move in game.legal_moves())
+                blank_generate_times.append((generate_times[-1], time.perf_counter() - start))
+                blank_move_counts.append((move_count, blank_move_count))
+                start = time.perf_counter()
+                game.best_move()
+                blank_best_move_times.append((best_move_times[-1], time.perf_counter() - start))
+                game.racks[game.current_player] = rack
+            game.apply(best_move)
+
+    # ru_maxrss is in kB on Linux and in bytes on macOS
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1 << 20 if sys.platform == 'darwin' else 1 << 10)
+    results = {
+        'turns': len(generate_times),
+        'generate_moves_mean_ms': 1000 * sum(generate_times) / len(generate_times),
+        'generate_moves_p95_ms': 1000 * percentile(generate_times, 0.95),
+        'best_move_mean_ms': 1000 * sum(best_move_times) / len(best_move_times),
+        'best_move_p95_ms': 1000 * percentile(best_move_times, 0.95),
+        'two_blanks_generate_moves_multiple': sum(times[1] for times in blank_generate_times) / sum(times[0] for times in blank_generate_times),
+        'two_blanks_move_count_multiple': sum(counts[1] for counts in blank_move_counts) / sum(counts[0] for counts in blank_move_counts),
+        'two_blanks_best_move_multiple': sum(times[1] for times in blank_best_move_times) / sum(times[0] for times in blank_best_move_times),
+        'lexicon_mb': (os.path.getsize('DAWG/root_dawg.dawg') + os.path.getsize('DAWG/gaddag.dawg')) / (1 << 20),
+        'process_peak_mb': peak_memory,
+    }
+    results['two_blanks_cost_per_move_multiple'] = results['two_blanks_generate_moves_multiple'] / results['two_blanks_move_count_multiple']
+    results['two_blanks_best_move_cost_per_move_multiple'] = results['two_blanks_best_move_multiple'] / results['two_blanks_move_count_multiple']
+    return results
+
+def over_budget(results):
+    """
+    Lists the results that exceed their budget.
+
+    Parameters:
+    - results (dict): The results of `benchmark`.
+
+    Returns:
+    - list of str: A message for every exceeded budget, empty if all budgets are met.
+    """
+    budgets = [('generate_moves_p95_ms', GENERATE_MOVES_BUDGET_MS), ('best_move_p95_ms', BEST_MOVE_BUDGET_MS),
+               ('lexicon_mb', LEXICON_MEMORY_BUDGET_MB), ('process_peak_mb', PROCESS_MEMORY_BUDGET_MB),
+               ('two_blanks_cost_per_move_multiple', TWO_BLANKS_COST_PER_MOVE_MULTIPLE),
+               ('two_blanks_best_move_cost_per_move_multiple', TWO_BLANKS_BEST_MOVE_COST_PER_MOVE_MULTIPLE)]
+    return [f"{name} is {results[name]:.1f}, the budget is {budget}" for name, budget in budgets if results[name] > budget]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Times move generation and measures lexicon memory against their budgets.")
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = benchmark(args.games, args.seed)
+    for name, value in results.items():
+        print(f"{name}: {value:.1f}" if isinstance(value, float) else f"{name}: {value}")
+    failures = over_budget(results)
+    for failure in failures:
+        print(f"Over budget: {failure}")
+    sys.exit(1 if failures else 0)
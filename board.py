@@ -0,0 +1,76 @@
+class Board(list):
+    """
+    A 15x15 board that keeps a row view and a column view of the same squares.
+
+    The board itself is the list of rows, so `board[row][col]` reads a square like the plain list of lists used
+    elsewhere. `columns[col][row]` holds the same letter, which makes `columns` the transposed board without
+    copying it every turn. Letters must be placed with `place` so both views stay in sync.
+    """
+
+    def __init__(self, rows=None, size=15):
+        """
+        Creates a board from a list of rows, or an empty board.
+
+        Parameters:
+        - rows (list of lists, optional): The letters of the board, ' ' for an empty square. The rows are copied.
+        - size (int, default=15): The size of an empty board when no rows are given.
+        """
+        if rows is None:
+            rows = [[' '] * size for _ in range(size)]
+        super().__init__(list(row) for row in rows)
+        self.columns = [list(column) for column in zip(*self)]
+
+    @property
+    def rows(self):
+        return self
+
+    def view(self, is_transposed=False):
+        """
+        Returns the board along one of its axes, without copying it.
+
+        Parameters:
+        - is_transposed (bool, default=False): Whether to return the column view, which is indexed as [col][row].
+
+        Returns:
+        - list of lists: The rows or the columns of the board.
+        """
+        return self.columns if is_transposed else self
+
+    def place(self, row, col, letter):
+        """
+        Places a letter on a square in both views.
+
+        Parameters:
+        - row (int): The row of the square.
+        - col (int): The column of the square.
+        - letter (str): The letter to place.
+        """
+        self[row][col] = letter
+        self.columns[col][row] = letter
+
+
+def vertical_run_ends(board, placed_cells):
+    """
+    Finds the empty squares at both ends of the vertical run of tiles through each placed tile. These are the only
+    empty squares whose vertical word changes when the tiles are placed.
+
+    Parameters:
+    - board (list of lists): The board after the tiles have been placed.
+    - placed_cells (list of tuples): The (row, col) positions of the placed tiles.
+
+    Returns:
+    - set of tuples: The (row, col) positions of the empty squares above and below the runs.
+    """
+    ends = set()
+    for row, col in placed_cells:
+        above = row
+        while above >= 0 and board[above][col] != ' ':
+            above -= 1
+        below = row
+        while below < 15 and board[below][col] != ' ':
+            below += 1
+        if above >= 0:
+            ends.add((above, col))
+        if below < 15:
+            ends.add((below, col))
+    return ends
@@ -0,0 +1,579 @@
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# A blank tile on the rack. On the board a blank is the lowercase letter it was played as
+BLANK = '?'
+
+# Binary file layout: header, alphabet padded to 4 bytes, little endian int32 edge table, terminal bitset
+FILE_MAGIC = b'WFDAWG\r\n'
+FILE_VERSION = 1
+HEADER = struct.Struct('<8sHHIII32s')
+
+class DAWG:
+    """
+    A Directed Acyclic Word Graph (DAWG) stored in flat integer arrays instead of nested dictionaries.
+
+    Node 0 is an empty sink node without children, every missing edge points to it. The root is node 1.
+    The child of `node` for the letter with index `i` is stored at `edges[node * width + i]`, terminal
+    nodes are marked in the `terminal` bitset (bit `node & 7` of byte `node >> 3`).
+    """
+
+    def __init__(self, alphabet=ALPHABET):
+        """
+        Creates an empty DAWG containing only the sink node and the root node.
+
+        Parameters:
+        - alphabet (str, default=ALPHABET): The letters that can be used on the edges, their position in the string is their index in the edge table.
+        """
+        self.alphabet = alphabet
+        self.width = len(alphabet)
+        self.letter_index = {letter: i for i, letter in enumerate(alphabet)}
+        # Blanks on the board follow the edges of the letter they stand for
+        self.letter_index.update({letter.lower(): i for i, letter in enumerate(alphabet)})
+        self.root = 1
+        self.node_count = 2
+        self.edges = array('i', [0]) * (self.node_count * self.width)
+        self.terminal = bytearray(1)
+        self.fingerprint = bytes(32)
+
+    def add_node(self):
+        """
+        Appends a new node without children to the edge table.
+
+        Returns:
+        - int: The id of the new node.
+        """
+        node = self.node_count
+        self.node_count += 1
+        self.edges.extend(array('i', [0]) * self.width)
+        if node >> 3 >= len(self.terminal):
+            self.terminal.append(0)
+        return node
+
+    def child(self, node, letter):
+        """
+        Follows the edge labelled with a letter.
+
+        Parameters:
+        - node (int): The node to start from.
+        - letter (str): The letter of the edge to follow.
+
+        Returns:
+        - int: The id of the child node, or 0 if there is no such edge.
+        """
+        return self.edges[node * self.width + self.letter_index[letter]]
+
+    def children(self, node):
+        """
+        Lists all outgoing edges of a node.
+
+        Parameters:
+        - node (int): The node whose edges are listed.
+
+        Returns:
+        - list of tuples: (letter, child) pairs in alphabet order.
+        """
+        base = node * self.width
+        return [(letter, self.edges[base + i]) for i, letter in enumerate(self.alphabet) if self.edges[base + i]]
+
+    def is_terminal(self, node):
+        """
+        Checks whether a node marks the end of a valid word.
+
+        Parameters:
+        - node (int): The node to check.
+
+        Returns:
+        - bool: True if the node is terminal, False otherwise.
+        """
+        return bool(self.terminal[node >> 3] & (1 << (node & 7)))
+
+    def walk(self, word, node=None):
+        """
+        Follows the edges for every letter of a word.
+
+        Parameters:
+        - word (str): The letters to follow.
+        - node (int, optional): The node to start from. Defaults to the root.
+
+        Returns:
+        - int: The node reached after the last letter, or 0 if the path does not exist.
+        """
+        if node is None:
+            node = self.root
+        edges = self.edges
+        width = self.width
+        letter_index = self.letter_index
+        for letter in word:
+            node = edges[node * width + letter_index[letter]]
+            if not node:
+                return 0
+        return node
+
+    def insert(self, word):
+        """
+        Inserts a word, adding nodes for each letter that does not have an edge yet. Like the dictionary based trie,
+        words have to be inserted before `minimize` is called.
+
+        Parameters:
+        - word (str): The word to be inserted.
+
+        Returns:
+        - None: The DAWG is modified in place.
+        """
+        node = self.root
+        width = self.width
+        for letter in word:
+            index = node * width + self.letter_index[letter]
+            next_node = self.edges[index]
+            if not next_node:
+                next_node = self.add_node()
+                self.edges[index] = next_node
+            node = next_node
+        self.terminal[node >> 3] |= 1 << (node & 7)
+
+    def contains(self, word):
+        """
+        Searches for a word and checks if it is a terminal word (i.e., a complete and valid word).
+
+        Parameters:
+        - word (str): The word to search for.
+
+        Returns:
+        - bool: True if the word exists and is marked as terminal, False otherwise.
+        """
+        node = self.walk(word)
+        return bool(node) and self.is_terminal(node)
+
+    def signature(self, node):
+        """
+        Describes a node by its terminal status and outgoing edges, two nodes with the same signature are equivalent.
+
+        Parameters:
+        - node (int): The node to describe.
+
+        Returns:
+        - tuple: The terminal status followed by (letter index, child) pairs for every outgoing edge.
+        """
+        base = node * self.width
+        signature = [self.is_terminal(node)]
+        for i, child in enumerate(self.edges[base:base + self.width]):
+            if child:
+                signature.append(i)
+                signature.append(child)
+        return tuple(signature)
+
+    def post_order(self):
+        """
+        Lists every node reachable from the root so that each node comes after all of its children.
+
+        Returns:
+        - list of int: The reachable node ids in post-order, ending with the root.
+        """
+        width = self.width
+        edges = self.edges
+        visited = bytearray(self.node_count)
+        visited[0] = 1
+        order = []
+        stack = [(self.root, 0)]
+        while stack:
+            node, i = stack.pop()
+            base = node * width
+            while i < width and (not edges[base + i] or visited[edges[base + i]]):
+                i += 1
+            if i == width:
+                order.append(node)
+            else:
+                child = edges[base + i]
+                visited[child] = 1
+                stack.append((node, i + 1))
+                stack.append((child, 0))
+        return order
+
+    def minimize(self):
+        """
+        Minimizes the graph by merging equivalent nodes, which are nodes having the same children and terminal status.
+        The surviving nodes are renumbered so that the root stays node 1 and every parent has a lower id than its children.
+
+        Returns:
+        - int: The number of nodes left after minimization, including the sink node.
+        """
+        order = self.post_order()
+        canonical = array('i', [0]) * self.node_count
+        registry = {}
+        unique = []
+        for node in order:
+            signature = list(self.signature(node))
+            for i in range(2, len(signature), 2):
+                signature[i] = canonical[signature[i]]
+            signature = tuple(signature)
+            existing = registry.get(signature)
+            if existing is None:
+                existing = len(unique) + 1
+                registry[signature] = existing
+                unique.append(node)
+            canonical[node] = existing
+        del registry
+
+        # Reverse the numbering so that the root, registered last, becomes node 1
+        count = len(unique)
+        new_ids = array('i', [0]) * self.node_count
+        for node in order:
+            new_ids[node] = count + 1 - canonical[node]
+        return self.renumber(unique, new_ids)
+
+    def compact(self):
+        """
+        Removes the nodes that can no longer be reached, like `minimize` but without looking for equivalent nodes. This
+        is enough for a graph that is already minimal. The nodes keep their order and are moved down in place, so no
+        second edge table is needed.
+
+        Returns:
+        - int: The number of nodes left, including the sink node.
+        """
+        width = self.width
+        edges = self.edges
+        terminal = self.terminal
+        reachable = sorted(self.post_order())
+        new_ids = array('i', [0]) * self.node_count
+        for new_node, node in enumerate(reachable, 1):
+            new_ids[node] = new_node
+
+        # A node only moves to a lower id, onto a node that has been moved already
+        for new_node, node in enumerate(reachable, 1):
+            base = node * width
+            new_base = new_node * width
+            for i in range(width):
+                edges[new_base + i] = new_ids[edges[base + i]]
+            bit = 1 << (new_node & 7)
+            if terminal[node >> 3] & (1 << (node & 7)):
+                terminal[new_node >> 3] |= bit
+            else:
+                terminal[new_node >> 3] &= ~bit & 0xFF
+
+        self.node_count = len(reachable) + 1
+        del edges[self.node_count * width:]
+        del terminal[(self.node_count + 7) // 8:]
+        return self.node_count
+
+    def renumber(self, nodes, new_ids):
+        """
+        Rebuilds the edge table and terminal bitset with only the given nodes, under their new ids.
+
+        Parameters:
+        - nodes (list of int): The nodes to keep, their edges are copied.
+        - new_ids (array of int): The new id of every old node, children are mapped through it.
+
+        Returns:
+        - int: The number of nodes left, including the sink node.
+        """
+        width = self.width
+        edges = self.edges
+        count = len(nodes)
+        new_edges = array('i', [0]) * ((count + 1) * width)
+        new_terminal = bytearray((count + 1 + 7) // 8)
+        for node in nodes:
+            new_node = new_ids[node]
+            base = node * width
+            new_base = new_node * width
+            for i in range(width):
+                child = edges[base + i]
+                if child:
+                    new_edges[new_base + i] = new_ids[child]
+            if self.is_terminal(node):
+                new_terminal[new_node >> 3] |= 1 << (new_node & 7)
+
+        self.edges = new_edges
+        self.terminal = new_terminal
+        self.node_count = count + 1
+        return self.node_count
+
+    @classmethod
+    def from_words(cls, words, alphabet=ALPHABET):
+        """
+        Builds a minimized DAWG from a list of words.
+
+        Parameters:
+        - words (iterable of str): The words to insert.
+        - alphabet (str, default=ALPHABET): The letters that can be used on the edges.
+
+        Returns:
+        - DAWG: The minimized DAWG.
+        """
+        dawg = cls(alphabet)
+        for word in words:
+            dawg.insert(word)
+        dawg.minimize()
+        return dawg
+
+    @classmethod
+    def from_sorted_words(cls, words, alphabet=ALPHABET):
+        """
+        Builds a minimized DAWG incrementally from words in sorted order (Daciuk et al., 2000). Only the path of the
+        previous word is kept unminimized, so the uncompressed trie is never built, and the words are read one at a
+        time, so they can be streamed from a file or from `external_sort`.
+
+        Parameters:
+        - words (iterable of str): The words to insert, sorted. Duplicates are skipped.
+        - alphabet (str, default=ALPHABET): The letters that can be used on the edges.
+
+        Returns:
+        - DAWG: The minimized DAWG.
+        """
+        dawg = cls(alphabet)
+        register = {}
+        free_nodes = []
+        path = [dawg.root]
+        previous = ''
+        for word in words:
+            if word <= previous:
+                if word == previous:
+                    continue
+                raise ValueError(f"Words are not sorted: {word!r} comes after {previous!r}")
+            common = 0
+            while common < len(previous) and common < len(word) and previous[common] == word[common]:
+                common += 1
+            # The previous word's path below the common prefix can no longer change
+            dawg.replace_or_register(path, previous, common, register, free_nodes)
+            del path[common + 1:]
+            node = path[-1]
+            for letter in word[common:]:
+                child = free_nodes.pop() if free_nodes else dawg.add_node()
+                dawg.edges[node * dawg.width + dawg.letter_index[letter]] = child
+                path.append(child)
+                node = child
+            dawg.terminal[node >> 3] |= 1 << (node & 7)
+            previous = word
+        dawg.replace_or_register(path, previous, 0, register, free_nodes)
+        # The graph is minimal already, only the freed nodes are dropped
+        del register
+        dawg.compact()
+        return dawg
+
+    def replace_or_register(self, path, word, depth, register, free_nodes):
+        """
+        Merges the nodes on a word's path below a given depth with equivalent registered nodes, registering the ones
+        without an equivalent. Merged nodes are cleared and added to the free list.
+
+        Parameters:
+        - path (list of int): The nodes along the word, `path[i]` is reached after `i` letters.
+        - word (str): The word the path spells.
+        - depth (int): The number of letters of the path to keep as they are.
+        - register (dict): Maps packed node signatures to registered nodes.
+        - free_nodes (list of int): Node ids that can be reused.
+
+        Returns:
+        - None: The DAWG, register and free list are modified in place.
+        """
+        width = self.width
+        for i in range(len(path) - 1, depth, -1):
+            node = path[i]
+            # Packed into bytes, the signatures of all registered nodes take less than half the memory of tuples
+            signature = array('i', self.signature(node)).tobytes()
+            existing = register.get(signature)
+            if existing is None:
+                register[signature] = node
+            else:
+                self.edges[path[i - 1] * width + self.letter_index[word[i - 1]]] = existing
+                self.edges[node * width:(node + 1) * width] = array('i', [0]) * width
+                self.terminal[node >> 3] &= ~(1 << (node & 7))
+                free_nodes.append(node)
+
+    def save(self, filename):
+        """
+        Saves the DAWG in the versioned binary format that `load` can memory-map. The header holds the format version,
+        the table sizes, a CRC32 checksum of everything after the header and the fingerprint of the lexicon it was built from.
+        The file is written next to its destination and then renamed, so a reader never sees a partly written file.
+
+        Parameters:
+        - filename (str): The path and name of the file where the DAWG should be saved.
+
+        Returns:
+        - None: This function performs file I/O and does not return a value.
+        """
+        alphabet = self.alphabet.encode('ascii')
+        alphabet += bytes(-len(alphabet) % 4)
+        # The tables are written through views instead of copies, they are the largest part of a lexicon build
+        with memoryview(self.edges) as edges_view, memoryview(self.terminal) as terminal_view:
+            edges = edges_view[:self.node_count * self.width]
+            if sys.byteorder == 'big':
+                edges = array('i', edges)
+                edges.byteswap()
+            terminal = terminal_view[:(self.node_count + 7) // 8]
+            checksum = zlib.crc32(terminal, zlib.crc32(edges, zlib.crc32(alphabet)))
+            header = HEADER.pack(FILE_MAGIC, FILE_VERSION, self.width, self.node_count, self.root, checksum, self.fingerprint)
+            temporary_name = filename + '.tmp'
+            try:
+                with open(temporary_name, 'wb') as f:
+                    f.write(header)
+                    f.write(alphabet)
+                    f.write(edges)
+                    f.write(terminal)
+                os.replace(temporary_name, filename)
+            except BaseException:
+                if os.path.exists(temporary_name):
+                    os.remove(temporary_name)
+                raise
+            del edges, terminal
+
+    @classmethod
+    def load(cls, filename, verify=True):
+        """
+        Memory-maps a DAWG saved with `save`. The edge table and terminal bitset are read straight from the mapped file,
+        nothing is deserialized, so processes loading the same file share its physical pages.
+
+        Parameters:
+        - filename (str): The path and name of the file from which the DAWG should be loaded.
+        - verify (bool, default=True): Whether to check the CRC32 checksum of the file.
+
+        Returns:
+        - DAWG: A read-only DAWG backed by the mapped file.
+        """
+        with open(filename, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buffer) < HEADER.size:
+            raise ValueError(f"{filename} is too small to be a DAWG file")
+        magic, version, width, node_count, root, checksum, fingerprint = HEADER.unpack_from(buffer)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{filename} is not a DAWG file")
+        if version != FILE_VERSION:
+            raise ValueError(f"{filename} has format version {version}, expected {FILE_VERSION}")
+        alphabet_size = width + (-width % 4)
+        edges_start = HEADER.size + alphabet_size
+        terminal_start = edges_start + node_count * width * 4
+        end = terminal_start + (node_count + 7) // 8
+        if len(buffer) != end:
+            raise ValueError(f"{filename} is truncated or has trailing data")
+        view = memoryview(buffer)
+        if verify and zlib.crc32(view[HEADER.size:]) != checksum:
+            raise ValueError(f"{filename} failed its checksum")
+
+        dawg = cls(bytes(view[HEADER.size:HEADER.size + width]).decode('ascii'))
+        dawg.node_count = node_count
+        dawg.root = root
+        dawg.fingerprint = fingerprint
+        if sys.byteorder == 'little':
+            dawg.edges = view[edges_start:terminal_start].cast('i')
+        else:
+            dawg.edges = array('i', view[edges_start:terminal_start])
+            dawg.edges.byteswap()
+        dawg.terminal = view[terminal_start:end]
+        dawg.buffer = buffer
+        dawg.filename = filename
+        return dawg
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles a memory-mapped DAWG as a reference to its file instead of copying the tables. A process that unpickles
+        it maps the same file, so processes like the workers of a `multiprocessing.Pool` share the lexicon's physical
+        pages instead of each holding a copy. A DAWG built in memory is pickled with its tables.
+
+        Parameters:
+        - protocol (int): The pickle protocol.
+
+        Returns:
+        - tuple: The reduce value used by `pickle`.
+        """
+        if getattr(self, 'filename', None) is None:
+            return super().__reduce_ex__(protocol)
+        # The file was checked when it was loaded the first time
+        return self.load, (self.filename, False)
+
+def lexicon_fingerprint(filename, settings=b''):
+    """
+    Computes the fingerprint of a lexicon file, which is stored in the header of every DAWG built from it.
+
+    Parameters:
+    - filename (str): The path and name of the lexicon file.
+    - settings (bytes, default=b''): The settings the DAWG is built with, a DAWG built from the same file with other
+      settings gets another fingerprint.
+
+    Returns:
+    - bytes: The 32 byte SHA-256 digest of the file contents and the settings.
+    """
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(settings)
+    return digest.digest()
+
+def read_fingerprint(filename):
+    """
+    Reads the fingerprint from the header of a DAWG file, without loading the file.
+
+    Parameters:
+    - filename (str): The path and name of the DAWG file.
+
+    Returns:
+    - bytes or None: The fingerprint, or None if the file is missing or is not a DAWG file of the current version.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            header = f.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, width, node_count, root, checksum, fingerprint = HEADER.unpack(header)
+    if magic != FILE_MAGIC or version != FILE_VERSION:
+        return None
+    return fingerprint
+
+def external_sort(items, chunk_size=1 << 17):
+    """
+    Sorts strings with a fixed amount of memory. The strings are sorted in chunks that are written to temporary files,
+    which are merged while the result is read.
+
+    Parameters:
+    - items (iterable of str): The strings to sort, without newlines.
+    - chunk_size (int, default=2**17): The number of strings that are held in memory at once.
+
+    Returns:
+    - generator: Yields the strings in sorted order, duplicates included.
+    """
+    runs = []
+    try:
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                runs.append(write_sorted_run(chunk))
+                chunk = []
+        if not runs:
+            chunk.sort()
+            yield from chunk
+            return
+        if chunk:
+            runs.append(write_sorted_run(chunk))
+        del chunk
+        yield from heapq.merge(*((line[:-1] for line in run) for run in runs))
+    finally:
+        for run in runs:
+            run.close()
+
+def write_sorted_run(chunk):
+    """
+    Sorts a chunk of `external_sort` and writes it to a temporary file.
+
+    Parameters:
+    - chunk (list of str): The strings, sorted in place.
+
+    Returns:
+    - file: The temporary file, one string per line, positioned at the start.
+    """
+    chunk.sort()
+    run = tempfile.TemporaryFile('w+', encoding='ascii')
+    for item in chunk:
+        run.write(item + '\n')
+    run.seek(0)
+    return run
@@ -0,0 +1,233 @@
+import algorithm, application
+from board import vertical_run_ends
+
+class Game:
+    """
+    The state of a game between two players, without any input or output. User interfaces and simulations drive a game
+    by asking for its `legal_moves` and passing the chosen one to `apply`.
+
+    A move is given in the format `application.generate_moves` yields: ((move, score), is_transposed). Passing the turn
+    is the move None. The game is over when both players pass in a row, like in `main.play_game`.
+
+    Every move that is applied pushes an undo record with the squares it changed, the old values of the incremental
+    states of those squares, the rack before the move and the tiles drawn from the bag. `undo` restores them, so
+    search code can play a move and take it back without copying the game.
+    """
+
+    def __init__(self, root, gaddag, tile_bag=None, racks=None):
+        """
+        Starts a game on an empty board.
+
+        Parameters:
+        - root (DAWG): The DAWG of the lexicon, used for the cross-checks.
+        - gaddag (DAWG): The GADDAG of the lexicon, used for move generation.
+        - tile_bag (list of str, optional): The tiles in the bag, a full bag when not given.
+        - racks (tuple of lists, optional): The racks of player 1 and player 2, drawn from the bag when not given.
+        """
+        self.root = root
+        self.gaddag = gaddag
+        if tile_bag is None:
+            tile_bag = application.initialize_game_tile_bag()
+        if racks is None:
+            rack_player1, rack_player2, tile_bag = application.initialize_game_rack(tile_bag)
+            racks = rack_player1, rack_player2
+        self.initial_tile_bag = list(tile_bag)
+        self.initial_racks = [list(rack) for rack in racks]
+        self.history = []
+        self.restart()
+
+    def restart(self):
+        """
+        Puts the game back in its starting position, with the tile bag and racks it started with.
+        """
+        self.board = application.initialize_game_board()
+        self.tile_bag = list(self.initial_tile_bag)
+        self.racks = {1: list(self.initial_racks[0]), 2: list(self.initial_racks[1])}
+        self.scores = {1: 0, 2: 0}
+        self.words = {1: [], 2: []}
+        self.current_player = 1
+        self.passes = 0
+        self.history = []
+        self.undo_stack = []
+        self.cross_check_state = application.initialize_cross_check_state(self.root, self.board)
+        self.anchor_state = application.initialize_anchor_state(self.board)
+        self.cross_score_state = application.initialize_cross_score_state(self.board)
+
+    @property
+    def rack(self):
+        # The rack of the player to move
+        return self.racks[self.current_player]
+
+    def legal_moves(self):
+        """
+        Generates the moves of the player to move, with their scores.
+
+        Returns:
+        - generator: Yields ((move, score), is_transposed) tuples, see `application.generate_moves`.
+        """
+        return application.generate_moves(self.board, self.root, self.gaddag, self.rack, self.cross_check_state, self.anchor_state, self.cross_score_state)
+
+    def best_move(self):
+        """
+        Finds the highest scoring move of the player to move, see `application.get_best_move`.
+
+        Returns:
+        - tuple or None: The best move as ((move, score), is_transposed), or None if there are no moves.
+        """
+        # The full search, `application.find_best_move` gives the same move but its bounds prune too little to be faster
+        best_moves = application.get_best_move(self.legal_moves(), 1, self.board)
+        return best_moves[0] if best_moves else None
+
+    def apply(self, scored_move):
+        """
+        Plays a move for the player to move: the tiles are placed, the score is added, the rack is refilled from the
+        bag and the turn goes to the other player.
+
+        Parameters:
+        - scored_move (tuple or None): The move as ((move, score), is_transposed), or None to pass.
+        """
+        player = self.current_player
+        undo_record = None
+        if scored_move is not None:
+            (move, move_score), is_transposed = scored_move
+            placed_cells = application.get_placed_cells(self.board, move, is_transposed)
+            undo_record = self.anchor_changes(placed_cells)
+            self.board = application.update_board_with_best_move(self.board, move, is_transposed, self.anchor_state)
+            undo_record += self.state_changes(placed_cells)
+            application.update_cross_check_state(self.root, self.board, self.cross_check_state, placed_cells)
+            application.update_cross_score_state(self.board, self.cross_score_state, placed_cells)
+
+            self.scores[player] += move_score
+            self.words[player].append(self.word(move))
+            rack = self.racks[player]
+            undo_record += (list(rack), self.tile_bag[:len(placed_cells)])
+            algorithm.rack_manager(rack, self.tile_bag, move)
+        self.undo_stack.append((player, self.passes, undo_record))
+        self.passes = 0 if scored_move is not None else self.passes + 1
+        self.history.append(scored_move)
+        self.current_player = 2 if player == 1 else 1
+
+    def anchor_changes(self, placed_cells):
+        """
+        Records the anchors a move changes, before it is placed. Placed squares stop being anchors and their empty
+        neighbours become anchors.
+
+        Parameters:
+        - placed_cells (list of tuples): The (row, col) positions the move places tiles on.
+
+        Returns:
+        - tuple: (placed_cells, old_anchors), old_anchors lists each changed square and whether it was an anchor.
+        """
+        anchors = self.anchor_state[False]
+        squares = set(placed_cells)
+        for row, col in placed_cells:
+            squares.update(((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)))
+        old_anchors = [(cell, cell in anchors) for cell in squares if 0 <= cell[0] < 15 and 0 <= cell[1] < 15]
+        return placed_cells, old_anchors
+
+    def state_changes(self, placed_cells):
+        """
+        Records the cross-checks and cross scores a move changes, after its tiles are placed on the board but before
+        the states are updated.
+
+        Parameters:
+        - placed_cells (list of tuples): The (row, col) positions of the placed tiles.
+
+        Returns:
+        - tuple: (old_cross_checks, old_cross_scores), for both orientations a list of (square, old value) pairs,
+          the old value is None for a square that had no entry.
+        """
+        transposed_cells = [(col, row) for row, col in placed_cells]
+        old_cross_checks = {}
+        old_cross_scores = {}
+        for is_transposed, cells in ((False, placed_cells), (True, transposed_cells)):
+            squares = set(cells) | vertical_run_ends(application.board_view(self.board, is_transposed), cells)
+            cross_checks = self.cross_check_state[is_transposed]
+            cross_scores = self.cross_score_state[is_transposed]
+            old_cross_checks[is_transposed] = [(cell, cross_checks.get(cell)) for cell in squares]
+            old_cross_scores[is_transposed] = [(cell, cross_scores.get(cell)) for cell in squares]
+        return old_cross_checks, old_cross_scores
+
+    def undo(self):
+        """
+        Takes back the last move, in time proportional to the size of the move.
+
+        Returns:
+        - tuple or None: The move that was taken back.
+        """
+        if not self.undo_stack:
+            raise IndexError("There is no move to undo")
+        player, passes, undo_record = self.undo_stack.pop()
+        scored_move = self.history.pop()
+        self.current_player = player
+        self.passes = passes
+        if undo_record is None:
+            return scored_move
+
+        placed_cells, old_anchors, old_cross_checks, old_cross_scores, old_rack, drawn_tiles = undo_record
+        (move, move_score), is_transposed = scored_move
+        for row, col in placed_cells:
+            self.board.place(row, col, ' ')
+        for (row, col), was_anchor in old_anchors:
+            if was_anchor:
+                self.anchor_state[False].add((row, col))
+                self.anchor_state[True].add((col, row))
+            else:
+                self.anchor_state[False].discard((row, col))
+                self.anchor_state[True].discard((col, row))
+        for state, old_values in ((self.cross_check_state, old_cross_checks), (self.cross_score_state, old_cross_scores)):
+            for is_transposed, changes in old_values.items():
+                values = state[is_transposed]
+                for cell, value in changes:
+                    if value is None:
+                        values.pop(cell, None)
+                    else:
+                        values[cell] = value
+
+        self.scores[player] -= move_score
+        self.words[player].pop()
+        self.racks[player][:] = old_rack
+        self.tile_bag[:0] = drawn_tiles
+        return scored_move
+
+    def score(self):
+        """
+        Returns:
+        - tuple of int: The total scores of player 1 and player 2.
+        """
+        return self.scores[1], self.scores[2]
+
+    def is_over(self):
+        """
+        Returns:
+        - bool: Whether both players passed in a row.
+        """
+        return self.passes >= 2
+
+    def winner(self):
+        """
+        Returns:
+        - str: 'Player1', 'Player2' or 'Draw', decided by the total scores.
+        """
+        player1_total_score, player2_total_score = self.score()
+        if player1_total_score > player2_total_score:
+            return 'Player1'
+        if player1_total_score == player2_total_score:
+            return 'Draw'
+        return 'Player2'
+
+    @staticmethod
+    def word(move):
+        """
+        Returns the word of a move the way it reads on the board.
+
+        Parameters:
+        - move (tuple): The move as (initial_part, extended_part, word, anchor, side).
+
+        Returns:
+        - str: The word, the word of a move from the reversed DAWG is reversed again.
+        """
+        word = move[2]
+        if move[4] == 'left':
+            word = ''.join(reversed(word))
+        return word
@@ -0,0 +1,235 @@
+import hashlib
+import os
+import struct
+from array import array
+from itertools import combinations_with_replacement
+from dawg import ALPHABET, BLANK
+
+# The value in points of keeping a tile on the rack after a move, compared to drawing a new tile. Fitted on the score
+# of the next move in greedy self-play with the tile distribution of `application.initialize_game_tile_bag`. Greedy
+# play never keeps a blank, so its value is how much a blank instead of a random tile raises the best next score.
+TILE_LEAVE = {
+    "A": -0.9, "B": -1.4, "C": 0.2, "D": -2.2,
+    "E": -1.3, "F": -2.0, "G": -1.9, "H": -0.2,
+    "I": 0.8, "J": -5.5, "K": -3.4, "L": -0.9,
+    "M": -1.9, "N": -2.9, "O": -1.4, "P": -1.4,
+    "Q": -4.8, "R": -1.2, "S": 3.3, "T": -1.1,
+    "U": -1.0, "V": -4.1, "W": 0.9, "X": 1.8,
+    "Y": 13.0, "Z": -3.7, BLANK: 15.2
+}
+
+# The value of each extra copy of a letter on the rack, on top of the values of the tiles. Blanks are not counted
+DUPLICATE_LEAVE = -2.7
+
+# The value of each vowel or consonant more than the other on the rack, a blank is neither
+IMBALANCE_LEAVE = -1.1
+
+VOWELS = 'AEIOU'
+
+# A move places at least one tile, so at most 6 tiles of a rack of 7 are kept
+MAX_LEAVE = 6
+
+LEAVE_TABLE_PATH = 'DAWG/leave_values.bin'
+
+# The leave table file starts with a header: magic, format version, the number of values and the SHA-256 fingerprint
+# of the model constants above, so a table built from other values is rebuilt even though its size is the same
+FILE_MAGIC = b'WFLEAVE\n'
+FILE_VERSION = 1
+HEADER = struct.Struct('<8sHI32s')
+
+# The tiles a leave can hold, the blank is ranked after the letters
+LEAVE_TILES = ALPHABET + BLANK
+
+# BINOMIAL[n][k] is n choose k, for the ranks of the leaves
+BINOMIAL = [[1] + [0] * MAX_LEAVE]
+for n in range(1, len(LEAVE_TILES) + MAX_LEAVE):
+    previous = BINOMIAL[-1]
+    BINOMIAL.append([1] + [previous[k - 1] + previous[k] for k in range(1, MAX_LEAVE + 1)])
+
+# The leaves with k tiles are ranked after all leaves with fewer tiles
+LEAVE_OFFSET = [0]
+for k in range(MAX_LEAVE + 1):
+    LEAVE_OFFSET.append(LEAVE_OFFSET[-1] + BINOMIAL[len(LEAVE_TILES) + k - 1][k])
+
+LETTER_INDEX = {letter: i for i, letter in enumerate(LEAVE_TILES)}
+
+# The leave table of this process, loaded on first use by `best_equity_move`
+leave_table = None
+
+def leave_index(letter_indexes):
+    """
+    Ranks a leave among all multisets of at most `MAX_LEAVE` letters. A sorted multiset a_0 <= ... <= a_k-1 is a
+    combination b_i = a_i + i without repetition, whose rank in the combinatorial number system is the sum of
+    C(b_i, i + 1).
+
+    Parameters:
+    - letter_indexes (list of int): The indexes in `LEAVE_TILES` of the tiles of the leave, in ascending order.
+
+    Returns:
+    - int: The position of the leave in the leave table.
+    """
+    index = LEAVE_OFFSET[len(letter_indexes)]
+    for i, letter_index in enumerate(letter_indexes):
+        index += BINOMIAL[letter_index + i][i + 1]
+    return index
+
+def leave_value(letters):
+    """
+    Computes the value of a leave from the tile values, the duplicates and the balance of vowels and consonants.
+
+    Parameters:
+    - letters (iterable of str): The letters that stay on the rack.
+
+    Returns:
+    - float: The value of the leave in points.
+    """
+    value = 0.0
+    vowels = consonants = 0
+    seen = set()
+    for letter in letters:
+        value += TILE_LEAVE[letter]
+        if letter == BLANK:
+            continue
+        if letter in seen:
+            value += DUPLICATE_LEAVE
+        seen.add(letter)
+        if letter in VOWELS:
+            vowels += 1
+        else:
+            consonants += 1
+    return value + IMBALANCE_LEAVE * abs(vowels - consonants)
+
+def build_leave_table():
+    """
+    Computes the value of every leave of at most `MAX_LEAVE` tiles, at the position `leave_index` gives it.
+
+    Returns:
+    - array: The values in tenths of points, as 16 bit integers.
+    """
+    table = array('h', bytes(2 * LEAVE_OFFSET[-1]))
+    for k in range(MAX_LEAVE + 1):
+        for letter_indexes in combinations_with_replacement(range(len(LEAVE_TILES)), k):
+            table[leave_index(letter_indexes)] = round(10 * leave_value(LEAVE_TILES[i] for i in letter_indexes))
+    return table
+
+def leave_fingerprint():
+    """
+    Computes the fingerprint of the leave model, which is stored in the header of the leave table file.
+
+    Returns:
+    - bytes: The SHA-256 digest of the tiles and the values the leave table is built from.
+    """
+    model = (LEAVE_TILES, sorted(TILE_LEAVE.items()), DUPLICATE_LEAVE, IMBALANCE_LEAVE, VOWELS, MAX_LEAVE)
+    return hashlib.sha256(repr(model).encode('utf-8')).digest()
+
+def save_leave_table(table, filename=LEAVE_TABLE_PATH):
+    """
+    Saves the leave table with its header. It is written to a temporary file first and then moved into place, so a
+    reader never sees a half written table.
+
+    Parameters:
+    - table (array): The leave table, see `build_leave_table`.
+    - filename (str, default=LEAVE_TABLE_PATH): The file of the table.
+    """
+    temporary_name = filename + '.tmp'
+    try:
+        with open(temporary_name, 'wb') as f:
+            f.write(HEADER.pack(FILE_MAGIC, FILE_VERSION, len(table), leave_fingerprint()))
+            table.tofile(f)
+        os.replace(temporary_name, filename)
+    except BaseException:
+        if os.path.exists(temporary_name):
+            os.remove(temporary_name)
+        raise
+
+def load_leave_table(filename=LEAVE_TABLE_PATH):
+    """
+    Loads the leave table, it is built and saved once if the file is missing or its header does not match the current
+    leave model, see `leave_fingerprint`.
+
+    Parameters:
+    - filename (str, default=LEAVE_TABLE_PATH): The file of the table.
+
+    Returns:
+    - array: The leave table, see `build_leave_table`.
+    """
+    table = array('h')
+    try:
+        with open(filename, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) == HEADER.size and HEADER.unpack(header) == (FILE_MAGIC, FILE_VERSION, LEAVE_OFFSET[-1], leave_fingerprint()):
+                table.fromfile(f, LEAVE_OFFSET[-1])
+                if not f.read(1):
+                    return table
+    except (FileNotFoundError, EOFError):
+        pass
+    table = build_leave_table()
+    save_leave_table(table, filename)
+    return table
+
+def rack_leave(table, rack, placed_letters):
+    """
+    Looks up the value of the tiles a move keeps on the rack.
+
+    Parameters:
+    - table (array): The leave table, see `load_leave_table`.
+    - rack (list of str): The letters on the rack.
+    - placed_letters (str): The letters the move places, lowercase for blanks.
+
+    Returns:
+    - float: The value of the leave in points.
+    """
+    leave = list(rack)
+    for letter in placed_letters:
+        leave.remove(BLANK if letter.islower() else letter)
+    return table[leave_index(sorted(LETTER_INDEX[letter] for letter in leave))] / 10
+
+def equity_moves(game, table=None):
+    """
+    Generates the moves of the player to move with their equity: the score plus the value of the tiles the move keeps.
+    Moves that place the same letters keep the same leave, so the leave is looked up once for each set of placed
+    letters. When the bag is empty no tiles are drawn anymore and only the score counts.
+
+    Parameters:
+    - game (Game): The game.
+    - table (array, optional): The leave table, see `load_leave_table`. The table of `LEAVE_TABLE_PATH` when not given.
+
+    Returns:
+    - generator: Yields (scored_move, equity) tuples, the moves as ((move, score), is_transposed).
+    """
+    global leave_table
+    if table is None:
+        if leave_table is None:
+            leave_table = load_leave_table()
+        table = leave_table
+    rack = game.rack
+    use_leave = bool(game.tile_bag)
+    leave_values = {}
+    for scored_move in game.legal_moves():
+        (move, move_score), is_transposed = scored_move
+        equity = move_score
+        if use_leave:
+            placed_letters = ''.join(sorted(move[1]))
+            if placed_letters not in leave_values:
+                leave_values[placed_letters] = rack_leave(table, rack, placed_letters)
+            equity += leave_values[placed_letters]
+        yield scored_move, equity
+
+def best_equity_move(game, table=None):
+    """
+    Chooses the move with the highest equity, see `equity_moves`. Among moves with the same equity the first one is chosen.
+
+    Parameters:
+    - game (Game): The game, the move is chosen for the player to move.
+    - table (array, optional): The leave table, see `load_leave_table`.
+
+    Returns:
+    - tuple or None: The move as ((move, score), is_transposed), or None if there are no moves.
+    """
+    best_move = None
+    best_equity = None
+    for scored_move, equity in equity_moves(game, table):
+        if best_equity is None or equity > best_equity:
+            best_move = scored_move
+            best_equity = equity
+    return best_move
@@ -0,0 +1,98 @@
+import os
+from collections import OrderedDict
+import algorithm
+from dawg import DAWG
+
+# The lexicon the game is played with when no other is chosen, as (language, version)
+DEFAULT_LEXICON = ('en', 'CSW19')
+
+# The total size in MB of the memory-mapped lexicons a registry keeps loaded
+LEXICON_MEMORY_CAP_MB = 256
+
+class LexiconRegistry:
+    """
+    The lexicons a process can play with, keyed by (language, version). A lexicon is compiled and memory-mapped on
+    first use, and every game that asks for it afterwards shares the same DAWG and GADDAG.
+
+    When the mapped files of the loaded lexicons together grow beyond the memory cap, the least recently used lexicons
+    are dropped. The last lexicon that was asked for is always kept, even if it is larger than the cap on its own. A
+    dropped lexicon stays mapped while games still hold it and is loaded again from its files when it is asked for.
+    """
+
+    def __init__(self, memory_cap_mb=LEXICON_MEMORY_CAP_MB):
+        """
+        Parameters:
+        - memory_cap_mb (float, default=LEXICON_MEMORY_CAP_MB): The total size in MB of the lexicons kept loaded.
+        """
+        self.memory_cap = memory_cap_mb * (1 << 20)
+        self.sources = {}
+        self.lexicons = OrderedDict()
+
+    def register(self, language, version, lexicon_path, directory=None):
+        """
+        Adds a lexicon to the registry without loading it.
+
+        Parameters:
+        - language (str): The language of the lexicon, for example 'en' or 'nl'.
+        - version (str): The version of the word list, for example 'CSW19'.
+        - lexicon_path (str): The path of the word list, one word per line.
+        - directory (str, optional): The directory of the compiled files, DAWG/<language>-<version> when not given.
+        """
+        if directory is None:
+            directory = os.path.join('DAWG', f"{language}-{version}")
+        self.sources[language, version] = (lexicon_path, directory)
+
+    def get(self, language, version):
+        """
+        Returns a lexicon, it is compiled the first time if its files are missing or out of date, see
+        `algorithm.compile_lexicon`, and memory-mapped if it is not loaded.
+
+        Parameters:
+        - language (str): The language of the lexicon.
+        - version (str): The version of the word list.
+
+        Returns:
+        - tuple: (root, gaddag), the DAWG for the cross-checks and the GADDAG for move generation.
+        """
+        key = (language, version)
+        if key in self.lexicons:
+            self.lexicons.move_to_end(key)
+            root, gaddag, size = self.lexicons[key]
+            return root, gaddag
+        if key not in self.sources:
+            raise KeyError(f"Unknown lexicon: {language} {version}")
+
+        lexicon_path, directory = self.sources[key]
+        os.makedirs(directory, exist_ok=True)
+        algorithm.compile_lexicon(('root_dawg.dawg', 'gaddag.dawg'), directory, lexicon_path)
+        root_filename = os.path.join(directory, 'root_dawg.dawg')
+        gaddag_filename = os.path.join(directory, 'gaddag.dawg')
+        root = DAWG.load(root_filename)
+        gaddag = DAWG.load(gaddag_filename)
+        self.lexicons[key] = (root, gaddag, os.path.getsize(root_filename) + os.path.getsize(gaddag_filename))
+        self.evict()
+        return root, gaddag
+
+    def evict(self):
+        # Drop the least recently used lexicons until the rest fits under the cap, but keep the newest one
+        while len(self.lexicons) > 1 and self.memory() > self.memory_cap:
+            self.lexicons.popitem(last=False)
+
+    def memory(self):
+        """
+        Returns:
+        - int: The total size in bytes of the files of the loaded lexicons.
+        """
+        return sum(size for root, gaddag, size in self.lexicons.values())
+
+    def loaded(self):
+        """
+        Returns:
+        - list of tuples: The (language, version) of the loaded lexicons, from least to most recently used.
+        """
+        return list(self.lexicons)
+
+# The registry of this process. The English lexicon keeps the files in DAWG/ it has always used, other lexicons are
+# added with `registry.register`, for example a Dutch OpenTaal word list as registry.register('nl', '2.20', path)
+registry = LexiconRegistry()
+registry.register(*DEFAULT_LEXICON, algorithm.LEXICON_PATH, 'DAWG')
@@ -0,0 +1,160 @@
+import concurrent.futures
+import os
+import random
+import time
+from collections import Counter
+import application
+from dawg import BLANK
+
+# The pool of processes for the rollouts and its size, created on first use by `get_rollout_pool`
+rollout_pool = None
+rollout_pool_workers = 0
+
+def unseen_tiles(game):
+    """
+    Lists the tiles the player to move cannot see: the full tile bag without the tiles on the board and on the rack.
+    These are the tiles on the opponent's rack and in the bag, in an unknown order.
+
+    Parameters:
+    - game (Game): The game.
+
+    Returns:
+    - list of str: The unseen tiles.
+    """
+    unseen = Counter(application.initialize_game_tile_bag())
+    # A lowercase letter on the board is a blank
+    unseen.subtract(BLANK if letter.islower() else letter for row in game.board for letter in row if letter != ' ')
+    unseen.subtract(game.rack)
+    return sorted(unseen.elements())
+
+def rollout_spreads(game, candidates, deadline, rollouts, seed):
+    """
+    Plays rounds of random rollouts of the candidate moves until the deadline or until every candidate has `rollouts`
+    of them. In a round the unseen tiles are shuffled and dealt over the opponent's rack and the bag once, and every
+    candidate is played out against them: the candidate is played, the opponent answers with its best move and the
+    player follows up with its best move, so the tiles a candidate keeps on the rack count as well. The moves are taken
+    back with `Game.undo`, the game is left as it was.
+
+    The deadline is checked before every rollout. A round that is not finished by then is dropped, so every candidate
+    has the same number of rollouts over the same tiles.
+
+    Parameters:
+    - game (Game): The game, the candidates are moves of the player to move.
+    - candidates (list of tuples): The moves as ((move, score), is_transposed).
+    - deadline (float): The time.time() after which no new rollouts are started.
+    - rollouts (int): The number of rollouts per candidate.
+    - seed (int): The seed of the shuffles.
+
+    Returns:
+    - tuple: The total spread of every candidate (list of int) and the number of finished rounds (int). The spread is
+      the candidate's score minus the score of the reply plus the score of the follow-up.
+    """
+    rng = random.Random(seed)
+    opponent = 2 if game.current_player == 1 else 1
+    opponent_rack = game.racks[opponent]
+    tile_bag = game.tile_bag
+    unseen = unseen_tiles(game)
+    # Without tiles in the bag the opponent's rack is known, so one rollout is enough
+    if not tile_bag:
+        rollouts = 1
+
+    total_spreads = [0] * len(candidates)
+    for rollout in range(rollouts):
+        # Every candidate is played against the same tiles, so the differences between them are not lost in the
+        # differences between the shuffles
+        rng.shuffle(unseen)
+        spreads = []
+        for scored_move in candidates:
+            if time.time() > deadline:
+                return total_spreads, rollout
+            if tile_bag:
+                game.racks[opponent] = unseen[:len(opponent_rack)]
+                game.tile_bag = unseen[len(opponent_rack):]
+            game.apply(scored_move)
+            reply = game.best_move()
+            game.apply(reply)
+            follow_up = game.best_move()
+            game.undo()
+            game.undo()
+            game.racks[opponent] = opponent_rack
+            game.tile_bag = tile_bag
+
+            (move, move_score), is_transposed = scored_move
+            spreads.append(move_score - (reply[0][1] if reply is not None else 0) + (follow_up[0][1] if follow_up is not None else 0))
+        total_spreads = [total_spread + spread for total_spread, spread in zip(total_spreads, spreads)]
+    return total_spreads, rollouts
+
+def start_worker():
+    # Unpickling this function imports the move generator in the worker, before the first rollouts are timed
+    return os.getpid()
+
+def get_rollout_pool(workers):
+    """
+    Returns the pool of processes for the rollouts, which is kept between moves. A new pool is started before it is
+    returned, so starting the processes does not count against the time budget of the first move.
+
+    Parameters:
+    - workers (int): The number of processes.
+
+    Returns:
+    - ProcessPoolExecutor: The pool.
+    """
+    global rollout_pool, rollout_pool_workers
+    if rollout_pool_workers != workers:
+        if rollout_pool is not None:
+            rollout_pool.shutdown()
+        rollout_pool = concurrent.futures.ProcessPoolExecutor(workers)
+        rollout_pool_workers = workers
+        concurrent.futures.wait([rollout_pool.submit(start_worker) for _ in range(workers)])
+    return rollout_pool
+
+def rank_moves(game, candidates=8, time_budget=1.0, rollouts=100, workers=1):
+    """
+    Ranks the highest scoring moves by their expected spread over the opponent's reply, estimated with random
+    rollouts, see `rollout_spreads`. With more than one worker the rollouts are split over a pool of processes, the
+    memory-mapped lexicon is shared with them. The time budget starts when the pool is running. Every candidate gets
+    the same number of rollouts, if not one round of rollouts fits in the time budget the moves keep the order of
+    their scores.
+
+    Parameters:
+    - game (Game): The game, the moves are ranked for the player to move.
+    - candidates (int, default=8): The number of highest scoring moves that are simulated.
+    - time_budget (float, default=1.0): The number of seconds after which no new rollouts are started.
+    - rollouts (int, default=100): The maximum number of rollouts per candidate.
+    - workers (int, default=1): The number of processes.
+
+    Returns:
+    - list of tuples: (scored_move, expected_spread) from best to worst, ties keep the order of the scores. Without
+      rollouts the expected spread is the score.
+    """
+    scored_moves = application.get_best_move(game.legal_moves(), candidates, game.board)
+    if len(scored_moves) <= 1:
+        return [(scored_move, scored_move[0][1]) for scored_move in scored_moves]
+
+    pool = get_rollout_pool(workers) if workers > 1 else None
+    deadline = time.time() + time_budget
+    if pool is not None:
+        jobs = [pool.submit(rollout_spreads, game, scored_moves, deadline, -(-rollouts // workers), random.getrandbits(64)) for _ in range(workers)]
+        results = [job.result() for job in jobs]
+    else:
+        results = [rollout_spreads(game, scored_moves, deadline, rollouts, random.getrandbits(64))]
+
+    count = sum(rounds for total_spreads, rounds in results)
+    if not count:
+        return [(scored_move, scored_move[0][1]) for scored_move in scored_moves]
+    ranked_moves = []
+    for i, scored_move in enumerate(scored_moves):
+        total_spread = sum(total_spreads[i] for total_spreads, rounds in results)
+        ranked_moves.append((scored_move, total_spread / count))
+    ranked_moves.sort(key=lambda ranked_move: ranked_move[1], reverse=True)
+    return ranked_moves
+
+def best_simulated_move(game, candidates=8, time_budget=1.0, rollouts=100, workers=1):
+    """
+    Chooses the move with the best expected spread, see `rank_moves`.
+
+    Returns:
+    - tuple or None: The move as ((move, score), is_transposed), or None if there are no moves.
+    """
+    ranked_moves = rank_moves(game, candidates, time_budget, rollouts, workers)
+    return ranked_moves[0][0] if ranked_moves else None
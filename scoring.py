@@ -0,0 +1,178 @@
+from board import vertical_run_ends
+from dawg import ALPHABET, BLANK
+
+# Point values of the letters and the premium squares of the board
+LETTER_POINT = {
+    "A": 1, "B": 4, "C": 5, "D": 2,
+    "E": 1, "F": 4, "G": 3, "H": 4,
+    "I": 2, "J": 4, "K": 3, "L": 3,
+    "M": 3, "N": 1, "O": 1, "P": 4,
+    "Q": 10, "R": 2, "S": 2, "T": 2,
+    "U": 2, "V": 4, "W": 5, "X": 8,
+    "Y": 8, "Z": 5
+}
+
+# A blank scores no points, on the rack and as the lowercase letter it is played as
+LETTER_POINT[BLANK] = 0
+LETTER_POINT.update({letter.lower(): 0 for letter in ALPHABET})
+
+# '2L' and '3L' multiply the letter placed on the square, '2W' and '3W' the word
+SQUARE_MULTIPLIER = {
+    (0, 0): '3L', (0, 1): '', (0, 2): '', (0, 3): '', (0, 4): '3W', (0, 5): '', (0, 6): '', (0, 7): '2L', (0, 8): '', (0, 9): '', (0, 10): '3W', (0, 11): '', (0, 12): '', (0, 13): '', (0, 14): '3L',
+    (1, 0): '', (1, 1): '2L', (1, 2): '', (1, 3): '', (1, 4): '', (1, 5): '3L', (1, 6): '', (1, 7): '', (1, 8): '', (1, 9): '3L', (1, 10): '', (1, 11): '', (1, 12): '', (1, 13): '2L', (1, 14): '',
+    (2, 0): '', (2, 1): '', (2, 2): '2W', (2, 3): '', (2, 4): '', (2, 5): '', (2, 6): '2L', (2, 7): '', (2, 8): '2L', (2, 9): '', (2, 10): '', (2, 11): '', (2, 12): '2W', (2, 13): '', (2, 14): '',
+    (3, 0): '', (3, 1): '', (3, 2): '', (3, 3): '3L', (3, 4): '', (3, 5): '', (3, 6): '', (3, 7): '2W', (3, 8): '', (3, 9): '', (3, 10): '', (3, 11): '3L', (3, 12): '', (3, 13): '', (3, 14): '',
+    (4, 0): '3W', (4, 1): '', (4, 2): '', (4, 3): '', (4, 4): '2W', (4, 5): '', (4, 6): '2L', (4, 7): '', (4, 8): '2L', (4, 9): '', (4, 10): '2W', (4, 11): '', (4, 12): '', (4, 13): '', (4, 14): '3W',
+    (5, 0): '', (5, 1): '3L', (5, 2): '', (5, 3): '', (5, 4): '', (5, 5): '3L', (5, 6): '', (5, 7): '', (5, 8): '', (5, 9): '3L', (5, 10): '', (5, 11): '', (5, 12): '', (5, 13): '3L', (5, 14): '',
+    (6, 0): '', (6, 1): '', (6, 2): '2L', (6, 3): '', (6, 4): '2L', (6, 5): '', (6, 6): '', (6, 7): '', (6, 8): '', (6, 9): '', (6, 10): '2L', (6, 11): '', (6, 12): '2L', (6, 13): '', (6, 14): '',
+    (7, 0): '2L', (7, 1): '', (7, 2): '', (7, 3): '2W', (7, 4): '', (7, 5): '', (7, 6): '', (7, 7): '', (7, 8): '', (7, 9): '', (7, 10): '', (7, 11): '2W', (7, 12): '', (7, 13): '', (7, 14): '2L',
+    (8, 0): '', (8, 1): '', (8, 2): '2L', (8, 3): '', (8, 4): '2L', (8, 5): '', (8, 6): '', (8, 7): '', (8, 8): '', (8, 9): '', (8, 10): '2L', (8, 11): '', (8, 12): '2L', (8, 13): '', (8, 14): '',
+    (9, 0): '', (9, 1): '3L', (9, 2): '', (9, 3): '', (9, 4): '', (9, 5): '3L', (9, 6): '', (9, 7): '', (9, 8): '', (9, 9): '3L', (9, 10): '', (9, 11): '', (9, 12): '', (9, 13): '3L', (9, 14): '',
+    (10, 0): '3W', (10, 1): '', (10, 2): '', (10, 3): '', (10, 4): '2W', (10, 5): '', (10, 6): '2L', (10, 7): '', (10, 8): '2L', (10, 9): '', (10, 10): '2W', (10, 11): '', (10, 12): '', (10, 13): '', (10, 14): '3W',
+    (11, 0): '', (11, 1): '', (11, 2): '', (11, 3): '3L', (11, 4): '', (11, 5): '', (11, 6): '', (11, 7): '2W', (11, 8): '', (11, 9): '', (11, 10): '', (11, 11): '3L', (11, 12): '', (11, 13): '', (11, 14): '',
+    (12, 0): '', (12, 1): '', (12, 2): '2W', (12, 3): '', (12, 4): '', (12, 5): '', (12, 6): '2L', (12, 7): '', (12, 8): '2L', (12, 9): '', (12, 10): '', (12, 11): '', (12, 12): '2W', (12, 13): '', (12, 14): '',
+    (13, 0): '', (13, 1): '2L', (13, 2): '', (13, 3): '', (13, 4): '', (13, 5): '3L', (13, 6): '', (13, 7): '', (13, 8): '', (13, 9): '3L', (13, 10): '', (13, 11): '', (13, 12): '', (13, 13): '2L', (13, 14): '',
+    (14, 0): '3L', (14, 1): '', (14, 2): '', (14, 3): '', (14, 4): '3W', (14, 5): '', (14, 6): '', (14, 7): '2L', (14, 8): '', (14, 9): '', (14, 10): '3W', (14, 11): '', (14, 12): '', (14, 13): '', (14, 14): '3L'
+}
+
+# The multipliers as numbers, indexed by [row][col], so scoring a move needs no string comparisons
+LETTER_MULTIPLIER = [[{'2L': 2, '3L': 3}.get(SQUARE_MULTIPLIER[(row, col)], 1) for col in range(15)] for row in range(15)]
+WORD_MULTIPLIER = [[{'2W': 2, '3W': 3}.get(SQUARE_MULTIPLIER[(row, col)], 1) for col in range(15)] for row in range(15)]
+
+# Points for placing all 7 letters of the rack
+BINGO_BONUS = 40
+
+def score_move(move, board=None):
+    """
+    Scores a move in one pass over the squares it places letters on. Letter multipliers count for the placed letter,
+    the word multipliers of the placed squares multiply the whole word. Every placed letter that touches tiles above
+    or below it also scores the vertical word it forms, with the multipliers of its square.
+
+    Parameters:
+    - move (tuple): A move, structured as (initial_part, extended_part, word, anchor, side).
+    - board (list of lists, optional): The board before the move is placed. When given, the letters of a 'right' move
+      skip the tiles already on the board and the vertical words are scored. Without a board only the word itself is scored.
+
+    Returns:
+    - int: The score of the move.
+    """
+    initial_part, extended_part, word, (row, col), side = move
+    letter_point = LETTER_POINT
+    main_score = 0
+    for letter in word:
+        main_score += letter_point[letter]
+
+    letter_multiplier = LETTER_MULTIPLIER[row]
+    word_multiplier = WORD_MULTIPLIER[row]
+    move_word_multiplier = 1
+    cross_score = 0
+    if side == 'left':
+        # The letters of a 'left' move end on the anchor
+        col -= len(extended_part) - 1
+    line = board[row] if board is not None and side == 'right' else None
+    for letter in extended_part:
+        if line is not None:
+            while line[col] != ' ':
+                col += 1
+        main_score += (letter_multiplier[col] - 1) * letter_point[letter]
+        move_word_multiplier *= word_multiplier[col]
+        if board is not None:
+            cross_points = cross_word_points((row, col), board)
+            if cross_points is not None:
+                cross_score += (cross_points + letter_point[letter] * letter_multiplier[col]) * word_multiplier[col]
+        col += 1
+
+    total_score = main_score * move_word_multiplier + cross_score
+    if len(extended_part) == 7:
+        total_score += BINGO_BONUS
+    return total_score
+
+def cross_word_points(anchor, board):
+    """
+    Adds up the points of the tiles directly above and below an empty cell, which form a vertical word with a letter
+    placed in the cell.
+
+    Parameters:
+    - anchor (tuple): The (row, col) position of the empty cell.
+    - board (list of lists): The board.
+
+    Returns:
+    - int or None: The points of the tiles, or None if there are no tiles directly above or below the cell.
+    """
+    row, col = anchor
+    letter_point = LETTER_POINT
+    points = 0
+    has_tiles = False
+    above = row - 1
+    while above >= 0 and board[above][col] != ' ':
+        points += letter_point[board[above][col]]
+        has_tiles = True
+        above -= 1
+    below = row + 1
+    while below < 15 and board[below][col] != ' ':
+        points += letter_point[board[below][col]]
+        has_tiles = True
+        below += 1
+    return points if has_tiles else None
+
+def cross_word_scores(anchor, board):
+    """
+    Computes the score of the vertical word formed by placing each letter in an empty cell.
+
+    Parameters:
+    - anchor (tuple): The (row, col) position of the empty cell.
+    - board (list of lists): The board.
+
+    Returns:
+    - tuple of int or None: The score for every letter of the alphabet, in alphabet order, followed by the score for
+      a blank, or None if placing a letter in the cell forms no vertical word.
+    """
+    cross_points = cross_word_points(anchor, board)
+    if cross_points is None:
+        return None
+    row, col = anchor
+    letter_multiplier = LETTER_MULTIPLIER[row][col]
+    word_multiplier = WORD_MULTIPLIER[row][col]
+    return tuple((cross_points + LETTER_POINT[letter] * letter_multiplier) * word_multiplier for letter in ALPHABET + BLANK)
+
+def precompute_cross_scores(board):
+    """
+    Computes the vertical word scores of every empty cell that has tiles directly above or below it, to go alongside
+    the cross-checks of `algorithm.precompute_cross_checks`.
+
+    Parameters:
+    - board (list of lists): The board.
+
+    Returns:
+    - dict: Maps (row, col) positions to the scores of `cross_word_scores`. Cells that form no vertical word are left out.
+    """
+    cross_scores = {}
+    for row in range(15):
+        for col in range(15):
+            if board[row][col] == ' ':
+                scores = cross_word_scores((row, col), board)
+                if scores is not None:
+                    cross_scores[(row, col)] = scores
+    return cross_scores
+
+def update_cross_scores(board, cross_scores, placed_cells):
+    """
+    Updates the vertical word scores after tiles have been placed. Like the cross-checks, only the empty cells at both
+    ends of the vertical run of tiles through each placed tile change.
+
+    Parameters:
+    - board (list of lists): The board after the tiles have been placed.
+    - cross_scores (dict): The vertical word scores before the tiles were placed, as made by `precompute_cross_scores`.
+    - placed_cells (list of tuples): The (row, col) positions of the placed tiles.
+
+    Returns:
+    - dict: The updated cross_scores dictionary, which is modified in place.
+    """
+    for cell in placed_cells:
+        cross_scores.pop(cell, None)
+
+    for row, col in vertical_run_ends(board, placed_cells):
+        scores = cross_word_scores((row, col), board)
+        if scores is not None:
+            cross_scores[(row, col)] = scores
+    return cross_scores
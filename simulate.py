@@ -0,0 +1,142 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import leaves, lexicons, montecarlo
+from game import Game
+
+STRATEGIES = ('greedy', 'random', 'simulate', 'equity')
+
+# Rollouts per candidate move of the 'simulate' strategy in batch games
+SIMULATION_ROLLOUTS = 10
+
+CSV_HEADER = ['Game Number', 'Player 1 Total Score', 'Player 1 Moves', 'Player 2 Total Score', 'Player 2 Moves', 'Winner']
+
+# The lexicon of a worker process, set once by `load_worker_lexicon`
+worker_lexicon = None
+
+def choose_move(strategy, game):
+    """
+    Chooses the move of a computer player without printing anything.
+
+    Parameters:
+    - strategy (str): 'greedy' for the highest scoring move, 'random' for a random move, 'simulate' for the move with
+      the best expected spread in random rollouts, see `montecarlo.rank_moves`, 'equity' for the highest score plus
+      value of the tiles kept on the rack, see `leaves.best_equity_move`.
+    - game (Game): The game, the move is chosen for the player to move.
+
+    Returns:
+    - tuple or None: The chosen move as ((move, score), is_transposed), or None if there are no moves.
+    """
+    if strategy == 'greedy':
+        return game.best_move()
+    if strategy == 'random':
+        all_scores = list(game.legal_moves())
+        return random.choice(all_scores) if all_scores else None
+    if strategy == 'simulate':
+        # The games of a simulation already run in parallel, so the rollouts of a move do not. A fixed number of
+        # rollouts instead of a time budget keeps the games the same for the same seed
+        return montecarlo.best_simulated_move(game, time_budget=float('inf'), rollouts=SIMULATION_ROLLOUTS)
+    if strategy == 'equity':
+        return leaves.best_equity_move(game)
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+def play_headless_game(root, gaddag, strategy1, strategy2, seed):
+    """
+    Plays a whole game between two computer players without prompts or output, following the rules of
+    `main.play_game`. The game ends when both players in a row have no move.
+
+    Parameters:
+    - root (DAWG): The DAWG of the lexicon.
+    - gaddag (DAWG): The GADDAG of the lexicon.
+    - strategy1 (str): The strategy of player 1, see `choose_move`.
+    - strategy2 (str): The strategy of player 2.
+    - seed (int): The seed of the random tiles and random moves, the same seed always plays the same game.
+
+    Returns:
+    - tuple: (player1_total_score, player1_list_of_moves, player2_total_score, player2_list_of_moves, winner), like `main.play_game`.
+    """
+    random.seed(seed)
+    game = Game(root, gaddag)
+    strategies = {1: strategy1, 2: strategy2}
+    while not game.is_over():
+        game.apply(choose_move(strategies[game.current_player], game))
+
+    player1_total_score, player2_total_score = game.score()
+    return player1_total_score, game.words[1], player2_total_score, game.words[2], game.winner()
+
+def load_worker_lexicon(root, gaddag):
+    # Runs once in every worker process. The DAWGs are memory-mapped files, a worker maps the same file as the
+    # parent process (see `DAWG.__reduce_ex__`), so all workers share one copy of the lexicon in memory
+    global worker_lexicon
+    worker_lexicon = root, gaddag
+
+def play_game_number(game):
+    """
+    Plays one game of a simulation in a worker process.
+
+    Parameters:
+    - game (tuple): (game_number, strategy1, strategy2, seed).
+
+    Returns:
+    - list: The row of the game in the CSV layout of `CSV_HEADER`.
+    """
+    game_number, strategy1, strategy2, seed = game
+    root, gaddag = worker_lexicon
+    player1_total_score, player1_list_of_moves, player2_total_score, player2_list_of_moves, winner = play_headless_game(root, gaddag, strategy1, strategy2, seed)
+    return [game_number, player1_total_score, '; '.join(player1_list_of_moves), player2_total_score, '; '.join(player2_list_of_moves), winner]
+
+def simulate(strategy1, strategy2, games, filename, seed=0, workers=None, lexicon=lexicons.DEFAULT_LEXICON):
+    """
+    Plays a number of games between two strategies over a pool of processes and writes the results to a CSV file
+    that `stats.analyze_game_results` can read. Game n is played with seed + n, so the results do not depend on the
+    number of workers.
+
+    Parameters:
+    - strategy1 (str): The strategy of player 1, see `choose_move`.
+    - strategy2 (str): The strategy of player 2.
+    - games (int): The number of games to play.
+    - filename (str): The CSV file to write.
+    - seed (int, default=0): The seed of the first game.
+    - workers (int, optional): The number of processes, all cores when not given.
+    - lexicon (tuple, default=DEFAULT_LEXICON): The (language, version) of the lexicon, see `lexicons.registry`.
+
+    Returns:
+    - None: The rows are written to the file in game order as the games finish.
+    """
+    for strategy in (strategy1, strategy2):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+    # The GADDAG and the leave table are built once here if they are missing, instead of in every worker at the same time
+    root, gaddag = lexicons.registry.get(*lexicon)
+    if 'equity' in (strategy1, strategy2):
+        leaves.load_leave_table()
+
+    all_games = [(game_number, strategy1, strategy2, seed + game_number) for game_number in range(1, games + 1)]
+    with open(filename, 'w', newline='') as file, multiprocessing.Pool(workers, initializer=load_worker_lexicon, initargs=(root, gaddag)) as pool:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+        for row in pool.imap(play_game_number, all_games, chunksize=max(1, games // (4 * (workers or multiprocessing.cpu_count())))):
+            writer.writerow(row)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plays computer players against each other without prompts.")
+    parser.add_argument('strategy1', choices=STRATEGIES)
+    parser.add_argument('strategy2', choices=STRATEGIES)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--language', default=lexicons.DEFAULT_LEXICON[0])
+    parser.add_argument('--version', default=lexicons.DEFAULT_LEXICON[1], help="the version of the lexicon")
+    parser.add_argument('--output', default=None, help="defaults to results/<strategy1>_vs_<strategy2>.csv")
+    parser.add_argument('--force', action='store_true', help="overwrite the output file if it exists")
+    args = parser.parse_args()
+
+    # The default keeps new results apart from the result files in the repository, and no file is overwritten unasked
+    filename = args.output or os.path.join('results', f"{args.strategy1}_vs_{args.strategy2}.csv")
+    if os.path.exists(filename) and not args.force:
+        parser.error(f"{filename} already exists, use --force to overwrite it")
+    if os.path.dirname(filename):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    simulate(args.strategy1, args.strategy2, args.games, filename, args.seed, args.workers, (args.language, args.version))
@@ -1,22 +1,37 @@
-from algorithm import create_node, insert, minimize, search_terminal_word, find_anchor_positions, precompute_cross_checks, is_cross_check_valid, collect_vertical_word, generate_word_left, collect_right_part_from_board, extend_left, generate_word_right, collect_left_part_from_board, extend_right, rack_manager
-from application import transpose_board_counterclockwise, transpose_board_clockwise, game_scores, give_scores, get_best_move, update_board_with_best_move
+from board import Board
+from scoring import LETTER_MULTIPLIER, WORD_MULTIPLIER, score_move, precompute_cross_scores, update_cross_scores
+from dawg import ALPHABET, DAWG, external_sort, read_fingerprint
+from algorithm import ALL_LETTERS_MASK, SEPARATOR, build_fingerprint, compile_lexicon, read_lexicon, count_rack, cross_check_mask, update_cross_checks, gaddag_entries, generate_word_gaddag, search_terminal_word, find_anchor_positions, precompute_cross_checks, is_cross_check_valid, collect_vertical_word, generate_word_left, collect_right_part_from_board, extend_left, generate_word_right, collect_left_part_from_board, extend_right, rack_manager
+from application import transpose_board, transpose_board_counterclockwise, transpose_board_clockwise, game_scores, give_scores, get_best_move, find_best_move, placement_key, update_board_with_best_move, get_placed_cells, initialize_anchor_state, initialize_game_tile_bag, generate_moves, move_generation, score_moves, moves_score_is_transposed
+from simulate import play_headless_game
+from game import Game
+from montecarlo import unseen_tiles, rank_moves
+from lexicons import LexiconRegistry
+from leaves import HEADER, LEAVE_OFFSET, LEAVE_TILES, LETTER_INDEX, leave_index, leave_value, load_leave_table, rack_leave, best_equity_move
+from array import array
+from itertools import combinations_with_replacement
+import os
+import pickle
+import tempfile
 import unittest
 
 class TestScrabbleGame(unittest.TestCase):
     def setUp(self):
-        self.root = create_node()
-        self.reversed_root = create_node()
+        self.root = DAWG()
+        self.reversed_root = DAWG()
 
         words = ["cat", "cats", "car", "cars", "do", "dog", "dogs", "done", "ear", "ears", "eat", "eats", "ercat"]
         for word in words:
             word = word.upper()
             word = ''.join(reversed(word))
-            insert(self.reversed_root, word)
-        minimize(self.reversed_root)
+            self.reversed_root.insert(word)
+        self.reversed_root.minimize()
         for word in words:
             word = word.upper()
-            insert(self.root, word)
-        minimize(self.root)
+            self.root.insert(word)
+        self.root.minimize()
+        entries = sorted(entry for word in words for entry in gaddag_entries(word.upper()))
+        self.gaddag = DAWG.from_sorted_words(entries, ALPHABET + SEPARATOR)
 
         self.rack = ['C', 'A', 'T', 'S', 'R', 'E', 'N']
         self.tile_bag = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
@@ -47,6 +62,121 @@ class TestScrabbleGame(unittest.TestCase):
         self.assertTrue(search_terminal_word(self.reversed_root, 'SRAE'))
         self.assertFalse(search_terminal_word(self.reversed_root, 'NONE'))
 
+    def test_minimize_merges_equivalent_nodes(self):
+        # CATS, CARS, EATS and EARS share their endings, the 13 trie nodes collapse into one node per depth
+        dawg = DAWG.from_words(["CATS", "CARS", "EATS", "EARS"])
+        self.assertEqual(dawg.node_count, 6)
+        for word in ["CATS", "CARS", "EATS", "EARS"]:
+            self.assertTrue(dawg.contains(word))
+        self.assertFalse(dawg.contains("CAT"))
+        self.assertFalse(dawg.contains("CATSS"))
+
+    def test_from_sorted_words_streamed(self):
+        words = ["cats", "do", "ercat", "cars", "dogs", "ear", "cat", "done", "eats", "car", "dog", "ears", "eat"]
+        with tempfile.TemporaryDirectory() as directory:
+            lexicon_path = os.path.join(directory, 'lexicon.txt')
+            with open(lexicon_path, 'w') as f:
+                f.write('\n'.join(words + ["overlong"]) + '\n')
+            self.assertEqual(list(read_lexicon(lexicon_path, 5)), [word.upper() for word in words])
+            # Sorted in chunks of 3 words, which are merged from temporary files
+            dawg = DAWG.from_sorted_words(external_sort(read_lexicon(lexicon_path, 5), chunk_size=3))
+        # The freed nodes are dropped, the same minimal graph as minimizing the whole trie
+        self.assertEqual(dawg.node_count, self.root.node_count)
+        for word in words:
+            self.assertTrue(dawg.contains(word.upper()))
+        self.assertFalse(dawg.contains("OVERLONG"))
+        self.assertEqual(list(external_sort(["B", "A", "C", "A"], chunk_size=2)), ["A", "A", "B", "C"])
+
+    def test_save_and_load_binary(self):
+        self.root.fingerprint = bytes(range(32))
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'root_dawg.dawg')
+            self.root.save(filename)
+            loaded = DAWG.load(filename)
+            self.assertEqual(loaded.node_count, self.root.node_count)
+            self.assertEqual(loaded.fingerprint, bytes(range(32)))
+            self.assertEqual(list(loaded.edges), list(self.root.edges))
+            self.assertTrue(search_terminal_word(loaded, 'ERCAT'))
+            self.assertFalse(search_terminal_word(loaded, 'ERCA'))
+            del loaded
+
+            # Flip one byte in the edge table
+            with open(filename, 'r+b') as f:
+                f.seek(-10, os.SEEK_END)
+                byte = f.read(1)
+                f.seek(-10, os.SEEK_END)
+                f.write(bytes([byte[0] ^ 1]))
+            with self.assertRaises(ValueError):
+                DAWG.load(filename)
+
+    def test_read_fingerprint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            lexicon = os.path.join(directory, 'lexicon.txt')
+            with open(lexicon, 'w') as f:
+                f.write("CAT\nCATS\n")
+            filename = os.path.join(directory, 'root_dawg.dawg')
+            self.assertIsNone(read_fingerprint(filename))
+
+            self.root.fingerprint = build_fingerprint(lexicon, 15)
+            self.root.save(filename)
+            self.assertEqual(read_fingerprint(filename), build_fingerprint(lexicon, 15))
+            self.assertNotEqual(read_fingerprint(filename), build_fingerprint(lexicon, 8))
+
+    def test_compile_lexicon(self):
+        with tempfile.TemporaryDirectory() as directory:
+            lexicon = os.path.join(directory, 'lexicon.txt')
+            with open(lexicon, 'w') as f:
+                f.write("CAT\nCATS\nDOG\n")
+            names = compile_lexicon(directory=directory, lexicon_path=lexicon, workers=3)
+            self.assertEqual(sorted(names), ['gaddag.dawg', 'reversed_root_dawg.dawg', 'root_dawg.dawg'])
+            self.assertTrue(search_terminal_word(DAWG.load(os.path.join(directory, 'root_dawg.dawg')), 'CATS'))
+            self.assertTrue(search_terminal_word(DAWG.load(os.path.join(directory, 'reversed_root_dawg.dawg')), 'GOD'))
+            self.assertTrue(search_terminal_word(DAWG.load(os.path.join(directory, 'gaddag.dawg')), 'TAC+S'))
+            self.assertEqual([name for name in os.listdir(directory) if name.endswith('.tmp')], [])
+
+            # Nothing is rebuilt until the lexicon changes
+            self.assertEqual(compile_lexicon(directory=directory, lexicon_path=lexicon, workers=3), [])
+            with open(lexicon, 'a') as f:
+                f.write("DOGS\n")
+            self.assertEqual(compile_lexicon(('root_dawg.dawg',), directory, lexicon, workers=3), ['root_dawg.dawg'])
+            self.assertTrue(search_terminal_word(DAWG.load(os.path.join(directory, 'root_dawg.dawg')), 'DOGS'))
+
+    def test_lexicon_registry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            registry = LexiconRegistry(memory_cap_mb=0)
+            for language, words in (('en', "CAT\nCATS\n"), ('nl', "KAT\nKATTEN\nCAFÉ\n")):
+                lexicon = os.path.join(directory, f"{language}.txt")
+                with open(lexicon, 'w', encoding='utf-8') as f:
+                    f.write(words)
+                registry.register(language, '1', lexicon, os.path.join(directory, language))
+
+            root, gaddag = registry.get('en', '1')
+            self.assertIs(registry.get('en', '1')[1], gaddag)
+            self.assertTrue(search_terminal_word(root, 'CATS'))
+
+            # The cap is smaller than one lexicon, so only the last one stays loaded
+            root, gaddag = registry.get('nl', '1')
+            self.assertTrue(search_terminal_word(root, 'KATTEN'))
+            self.assertEqual(registry.loaded(), [('nl', '1')])
+            self.assertEqual(registry.memory(), os.path.getsize(os.path.join(directory, 'nl', 'root_dawg.dawg')) + os.path.getsize(os.path.join(directory, 'nl', 'gaddag.dawg')))
+            with self.assertRaises(KeyError):
+                registry.get('de', '1')
+
+    def test_pickle_mapped_dawg(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'root_dawg.dawg')
+            self.root.save(filename)
+            loaded = DAWG.load(filename)
+            # A mapped DAWG is pickled as its file name, not as its tables
+            data = pickle.dumps(loaded)
+            self.assertLess(len(data), 200)
+            unpickled = pickle.loads(data)
+            self.assertEqual(list(unpickled.edges), list(self.root.edges))
+            self.assertTrue(search_terminal_word(unpickled, 'ERCAT'))
+            del loaded, unpickled
+        # A DAWG built in memory still pickles its tables
+        self.assertTrue(search_terminal_word(pickle.loads(pickle.dumps(self.root)), 'CATS'))
+
     def test_find_anchor_positions(self):
         anchors = find_anchor_positions(self.board)
         expected_anchors = [(6, 7), (6, 8), (6, 9), (7, 6), (7, 10), (8, 7), (8, 8), (8, 9)]
@@ -54,14 +184,48 @@ class TestScrabbleGame(unittest.TestCase):
 
     def test_precompute_cross_checks(self):
         cross_checks = precompute_cross_checks(self.root, self.board)
-        self.assertEqual(cross_checks[(6, 7)], [])
-        self.assertEqual(cross_checks[(6, 8)], [])
-        self.assertEqual(cross_checks[(6, 9)], [])
-        self.assertEqual(cross_checks[(7, 6)], ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z'])
-        self.assertEqual(cross_checks[(7, 10)], ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z'])
-        self.assertEqual(cross_checks[(8, 7)], [])
-        self.assertEqual(cross_checks[(8, 8)], [])
-        self.assertEqual(cross_checks[(8, 9)], [])
+        self.assertEqual(cross_checks[(6, 7)], 0)
+        self.assertEqual(cross_checks[(6, 8)], 0)
+        self.assertEqual(cross_checks[(6, 9)], 0)
+        self.assertEqual(cross_checks[(7, 6)], ALL_LETTERS_MASK)
+        self.assertEqual(cross_checks[(7, 10)], ALL_LETTERS_MASK)
+        self.assertEqual(cross_checks[(8, 7)], 0)
+        self.assertEqual(cross_checks[(8, 8)], 0)
+        self.assertEqual(cross_checks[(8, 9)], 0)
+
+    def test_cross_check_mask(self):
+        board = transpose_board(self.board)
+        # No single letter in front of CAT makes a word, after it only S makes CATS
+        self.assertEqual(cross_check_mask(self.root, (6, 7), board), 0)
+        self.assertEqual(cross_check_mask(self.root, (10, 7), board), 1 << (ord('S') - ord('A')))
+        # Between EA_ and the S of a vertical word only T and R make EATS and EARS
+        board[3][3], board[4][3], board[6][3] = 'E', 'A', 'S'
+        mask = cross_check_mask(self.root, (5, 3), board)
+        self.assertEqual(mask, (1 << (ord('R') - ord('A'))) | (1 << (ord('T') - ord('A'))))
+        for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
+            self.assertEqual(bool(mask >> (ord(letter) - ord('A')) & 1), is_cross_check_valid(self.root, letter, (5, 3), board))
+
+    def test_update_cross_checks(self):
+        # Play CATS downwards from the C, only the cells at both ends of the new vertical word change
+        best_move = ('C', 'ATS', 'CATS', (7, 8), 'right')
+        transposed_board = transpose_board(self.board)
+        placed_cells = get_placed_cells(self.board, best_move, True)
+        self.assertEqual(placed_cells, [(8, 7), (9, 7), (10, 7)])
+        board = transpose_board(update_board_with_best_move(transposed_board, best_move))
+        cross_checks = update_cross_checks(self.root, board, dict(self.cross_checks), placed_cells)
+        self.assertEqual(cross_checks, precompute_cross_checks(self.root, board))
+        self.assertEqual(cross_checks[(6, 7)], 0)
+        self.assertEqual(cross_checks[(11, 7)], 0)
+
+    def test_update_anchor_positions(self):
+        # Placing CATS downwards keeps the anchors equal to a full scan of the new board
+        best_move = ('C', 'ATS', 'CATS', (7, 8), 'right')
+        anchor_state = initialize_anchor_state(self.board)
+        board = update_board_with_best_move(self.board, best_move, True, anchor_state)
+        self.assertEqual(board[10][7], 'S')
+        anchors = set(find_anchor_positions(board))
+        self.assertEqual(anchor_state[False], anchors)
+        self.assertEqual(anchor_state[True], {(col, row) for row, col in anchors})
 
     def test_transpose_board_counterclockwise(self):
         transposed = transpose_board_counterclockwise(self.board)
@@ -142,6 +306,208 @@ class TestScrabbleGame(unittest.TestCase):
         expected_moves = [('CAT', 'S', 'CATS', (7, 10), 'right')]
         self.assertEqual(expected_moves, move)
 
+    def test_generate_word_repeated_letters(self):
+        # Every distinct letter is tried once, so repeated letters on the rack give no duplicate moves
+        self.assertEqual(count_rack(['E', 'N', 'E', 'S', 'E']), {'E': 3, 'N': 1, 'S': 1})
+        move = generate_word_right((7, 10), ['S', 'S', 'S'], self.board, self.cross_checks, self.root)
+        self.assertEqual([('CAT', 'S', 'CATS', (7, 10), 'right')], move)
+        move = generate_word_left((7, 6), ['E', 'R', 'E', 'R'], self.board, self.cross_checks, self.reversed_root)
+        self.assertEqual([('CAT', 'ER', 'TACRE', (7, 6), 'left')], move)
+
+    def test_generate_word_right_not_a_prefix(self):
+        # TAC is not the start of a word, so the walk ends in the sink node and no move is recorded
+        board = [row[:] for row in self.board]
+        board[7][7:10] = ['T', 'A', 'C']
+        cross_checks = precompute_cross_checks(self.root, board)
+        self.assertEqual(generate_word_right((7, 10), self.rack, board, cross_checks, self.root), [])
+        self.assertEqual(board[7][7:11], ['T', 'A', 'C', ' '])
+
+    def test_gaddag_entries(self):
+        self.assertEqual(gaddag_entries('CAT'), ['C+AT', 'AC+T', 'TAC+'])
+        self.assertTrue(search_terminal_word(self.gaddag, 'TACRE+'))
+        self.assertTrue(search_terminal_word(self.gaddag, 'RE+CAT'))
+        self.assertFalse(search_terminal_word(self.gaddag, 'ERCAT'))
+
+    def test_generate_word_gaddag(self):
+        anchors = set(find_anchor_positions(self.board))
+        moves = generate_word_gaddag((7, 6), self.rack, self.board, self.cross_checks, self.gaddag, anchors)
+        self.assertEqual([(('', 'ER', 'ERCAT', (7, 5), 'right'), 11)], moves)
+        moves = generate_word_gaddag((7, 10), self.rack, self.board, self.cross_checks, self.gaddag, anchors)
+        self.assertEqual([(('CAT', 'S', 'CATS', (7, 10), 'right'), 10)], moves)
+
+    def test_generate_word_gaddag_both_sides(self):
+        # SCATS needs letters on both sides of CAT, which the left and right generators cannot find
+        gaddag = DAWG.from_sorted_words(sorted(gaddag_entries('CAT') + gaddag_entries('SCATS')), ALPHABET + SEPARATOR)
+        anchors = set(find_anchor_positions(self.board))
+        moves = []
+        for anchor in sorted(anchors):
+            moves.extend(generate_word_gaddag(anchor, ['S', 'S'], self.board, self.cross_checks, gaddag, anchors))
+        # Found once, from the leftmost anchor it covers
+        self.assertEqual([(('', 'SS', 'SCATS', (7, 6), 'right'), 12)], moves)
+
+    def test_generate_moves(self):
+        moves = generate_moves(self.board, self.root, self.gaddag, self.rack)
+        # Moves are generated lazily, one anchor at a time, together with their scores
+        first_move = next(moves)
+        all_moves = move_generation(self.board, self.root, self.gaddag, self.rack)
+        scores = score_moves(iter(all_moves), self.board)
+        self.assertEqual([first_move] + list(moves), list(scores))
+        self.assertEqual(list(score_moves(all_moves, self.board)), moves_score_is_transposed(all_moves, self.board))
+
+    def test_get_best_move(self):
+        # TACRE from the left generator places the same letters as ERCAT from the GADDAG
+        left_move = ('CAT', 'ER', 'TACRE', (7, 6), 'left')
+        gaddag_move = ('', 'ER', 'ERCAT', (7, 5), 'right')
+        all_scores = [((('CAT', 'S', 'CATS', (7, 10), 'right'), 10), False), ((left_move, 11), False), ((gaddag_move, 11), False)]
+        self.assertEqual(get_best_move(iter(all_scores), 2, self.board), [((left_move, 11), False), ((('CAT', 'S', 'CATS', (7, 10), 'right'), 10), False)])
+        self.assertEqual(get_best_move(all_scores, 1), [((left_move, 11), False)])
+        self.assertEqual(len(get_best_move(all_scores, 5)), 3)
+        self.assertEqual(get_best_move([], 1), [])
+        self.assertEqual(get_best_move(all_scores, 0), [])
+        self.assertEqual(get_best_move(all_scores, -1), [])
+
+    def test_find_best_move(self):
+        best_move = get_best_move(generate_moves(self.board, self.root, self.gaddag, self.rack), 1, self.board)[0]
+        self.assertEqual(find_best_move(self.board, self.root, self.gaddag, self.rack), best_move)
+        self.assertIsNone(find_best_move(self.board, self.root, self.gaddag, []))
+
+    def test_blank_tiles(self):
+        game = Game(self.root, self.gaddag, list(self.tile_bag), (['C', 'A', '?', 'X', 'X', 'X', 'X'], ['E', 'A', 'R', 'S', 'X', 'X', 'X']))
+        legal_moves = list(game.legal_moves())
+        # The blank is played as the lowercase letter it stands for and scores no points
+        self.assertEqual({Game.word(move) for (move, score), is_transposed in legal_moves}, {'CAt', 'CAr'})
+        self.assertEqual(give_scores(('', 'CAt', 'CAt', (7, 7), 'right'))[1], 6)
+        for (move, score), is_transposed in legal_moves:
+            self.assertEqual(score, give_scores(move, game.board)[1])
+        self.assertTrue(search_terminal_word(self.root, 'CAtS'))
+
+        game.apply(legal_moves[0])
+        self.assertEqual(game.racks[1], ['X', 'X', 'X', 'X', 'A', 'B', 'C'])
+        rack = ['?', '?', 'E', 'S', 'X', 'X', 'X']
+        # Two blanks do not find the same placement twice
+        blank_moves = list(generate_moves(self.board, self.root, self.gaddag, rack))
+        self.assertEqual(len({placement_key(move, is_transposed, self.board) for (move, score), is_transposed in blank_moves}), len(blank_moves))
+        self.assertEqual(find_best_move(self.board, self.root, self.gaddag, rack), get_best_move(generate_moves(self.board, self.root, self.gaddag, rack), 1, self.board)[0])
+
+    def test_play_headless_game(self):
+        result = play_headless_game(self.root, self.gaddag, 'greedy', 'random', 3)
+        # The same seed plays the same game
+        self.assertEqual(play_headless_game(self.root, self.gaddag, 'greedy', 'random', 3), result)
+        player1_total_score, player1_list_of_moves, player2_total_score, player2_list_of_moves, winner = result
+        self.assertEqual(winner, 'Player1' if player1_total_score > player2_total_score else 'Draw' if player1_total_score == player2_total_score else 'Player2')
+        with self.assertRaises(ValueError):
+            play_headless_game(self.root, self.gaddag, 'best', 'random', 3)
+
+    def test_game(self):
+        game = Game(self.root, self.gaddag, list(self.tile_bag), (['C', 'A', 'T', 'S', 'X', 'X', 'X'], ['E', 'A', 'R', 'S', 'X', 'X', 'X']))
+        self.assertFalse(game.is_over())
+        best_move = game.best_move()
+        self.assertEqual(best_move[0][0][2], 'CATS')
+        self.assertIn(best_move, list(game.legal_moves()))
+        game.apply(best_move)
+        self.assertEqual(game.score(), (best_move[0][1], 0))
+        self.assertEqual(game.current_player, 2)
+        self.assertEqual(game.racks[1], ['X', 'X', 'X', 'A', 'B', 'C', 'D'])
+        self.assertEqual(game.words[1], ['CATS'])
+        # Both players passing ends the game
+        game.apply(None)
+        game.apply(None)
+        self.assertTrue(game.is_over())
+        self.assertEqual(game.winner(), 'Player1')
+
+    def test_game_undo(self):
+        game = Game(self.root, self.gaddag, list(self.tile_bag), (['C', 'A', 'T', 'S', 'X', 'X', 'X'], ['E', 'A', 'R', 'S', 'X', 'X', 'X']))
+        board = [list(row) for row in game.board]
+        states = [{t: dict(state[t]) for t in (False, True)} for state in (game.cross_check_state, game.cross_score_state)]
+        anchor_state = {t: set(game.anchor_state[t]) for t in (False, True)}
+        best_move = game.best_move()
+        game.apply(best_move)
+        second_move = game.best_move()
+        self.assertIsNotNone(second_move)
+        game.apply(second_move)
+        self.assertEqual(game.undo(), second_move)
+        self.assertEqual(game.undo(), best_move)
+        self.assertEqual(game.board, board)
+        self.assertEqual(game.board.columns, transpose_board(board))
+        self.assertEqual([game.cross_check_state, game.cross_score_state], states)
+        self.assertEqual(game.anchor_state, anchor_state)
+        self.assertEqual(game.racks, {1: ['C', 'A', 'T', 'S', 'X', 'X', 'X'], 2: ['E', 'A', 'R', 'S', 'X', 'X', 'X']})
+        self.assertEqual(game.tile_bag, self.tile_bag)
+        self.assertEqual((game.score(), game.words, game.current_player), ((0, 0), {1: [], 2: []}, 1))
+        with self.assertRaises(IndexError):
+            game.undo()
+
+    def test_rank_moves(self):
+        game = Game(self.root, self.gaddag, ['E', 'A', 'T', 'S', 'D', 'O'], (['C', 'A', 'T', 'S', 'X', 'X', 'X'], ['E', 'A', 'R', 'S', 'D', 'O', 'G']))
+        game.apply(game.best_move())
+        # Player 2 can see the board and its own rack, the opponent's rack and the bag are unseen
+        unseen = unseen_tiles(game)
+        self.assertEqual(len(unseen), len(initialize_game_tile_bag()) - 4 - 7)
+        # Five S tiles, one on the board and one on the rack
+        self.assertEqual(unseen.count('S'), 3)
+        board = [list(row) for row in game.board]
+        racks = {player: list(rack) for player, rack in game.racks.items()}
+        ranked_moves = rank_moves(game, candidates=3, rollouts=2)
+        self.assertEqual(len(ranked_moves), 3)
+        self.assertEqual([spread for move, spread in ranked_moves], sorted((spread for move, spread in ranked_moves), reverse=True))
+        # The rollouts leave the game as it was
+        self.assertEqual((game.board, game.racks, game.tile_bag), (board, racks, ['D', 'O']))
+        # Without time for a single rollout the moves keep the order of their scores
+        ranked_moves = rank_moves(game, candidates=3, time_budget=0)
+        self.assertEqual(ranked_moves, [(scored_move, scored_move[0][1]) for scored_move in get_best_move(game.legal_moves(), 3, game.board)])
+
+    def test_leave_index(self):
+        indexes = {leave_index(letter_indexes) for k in range(4) for letter_indexes in combinations_with_replacement(range(len(LEAVE_TILES)), k)}
+        self.assertEqual(indexes, set(range(LEAVE_OFFSET[4])))
+        self.assertEqual(leave_index([len(LEAVE_TILES) - 1] * 6), LEAVE_OFFSET[-1] - 1)
+        # Duplicates cost more than the tiles alone
+        self.assertLess(leave_value('SS'), 2 * leave_value('S'))
+
+    def test_best_equity_move(self):
+        table = array('h', bytes(2 * LEAVE_OFFSET[-1]))
+        table[leave_index(sorted(LETTER_INDEX[letter] for letter in 'SXXX'))] = 100
+        self.assertEqual(rack_leave(table, ['C', 'A', 'T', 'S', 'X', 'X', 'X'], 'ACT'), 10)
+        game = Game(self.root, self.gaddag, list(self.tile_bag), (['C', 'A', 'T', 'S', 'X', 'X', 'X'], ['E', 'A', 'R', 'S', 'X', 'X', 'X']))
+        self.assertEqual(game.best_move()[0][0][2], 'CATS')
+        # Keeping the S is worth more than the points it adds
+        self.assertEqual(best_equity_move(game, table)[0][0][2], 'CAT')
+        # Without tiles in the bag only the score counts
+        game.tile_bag = []
+        self.assertEqual(best_equity_move(game, table)[0][0][2], 'CATS')
+
+    def test_load_leave_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'leave_values.bin')
+            table = load_leave_table(filename)
+            self.assertEqual(os.listdir(directory), ['leave_values.bin'])
+            self.assertEqual(load_leave_table(filename), table)
+            # A table of the same size built from another model is rebuilt
+            with open(filename, 'r+b') as f:
+                f.seek(HEADER.size - 1)
+                last = f.read(1)
+                f.seek(HEADER.size - 1)
+                f.write(bytes([last[0] ^ 1]))
+                array('h', [1000] * LEAVE_OFFSET[-1]).tofile(f)
+            self.assertEqual(load_leave_table(filename), table)
+            self.assertEqual(load_leave_table(filename), table)
+
+    def test_board_views(self):
+        board = Board(self.board)
+        self.assertEqual(board, self.board)
+        self.assertEqual(board.view(True), transpose_board(self.board))
+        # Placing a vertical move updates the rows and the columns
+        update_board_with_best_move(board, ('C', 'ATS', 'CATS', (7, 8), 'right'), True)
+        self.assertEqual(board.rows[10][7], 'S')
+        self.assertEqual(board.columns[7][10], 'S')
+        self.assertEqual(board.columns, transpose_board(board))
+
+    def test_transpose_board(self):
+        transposed = transpose_board(self.board)
+        self.assertEqual(transposed[7][7], 'C')
+        self.assertEqual(transposed[8][7], 'A')
+        self.assertEqual(transposed[9][7], 'T')
+        self.assertEqual(transpose_board(transposed), self.board)
+
     def test_word_give_scores(self):
         move = ('CAT', 'S', 'CATS', (7, 10), 'right')
         score = give_scores(move)
@@ -152,6 +518,15 @@ class TestScrabbleGame(unittest.TestCase):
         expected_score = (('CAT', 'S', 'STAC', (7, 10), 'left'), 10)
         self.assertEqual(expected_score, score)
     
+    def test_give_scores_through_tiles(self):
+        board = [row[:] for row in self.board]
+        board[7][7:10] = [' ', ' ', ' ']
+        board[7][8:11] = ['C', 'A', 'T']
+        # The second S lands on the double word square at (7, 11), not next to the first S
+        move = ('', 'SS', 'SCATS', (7, 7), 'right')
+        self.assertEqual((move, 24), give_scores(move, board))
+        self.assertEqual((move, 12), give_scores(move))
+
     def test_multiplier_give_scores(self):
         move = ('', 'CATS', 'CATS', (11, 10), 'right')
         score = give_scores(move)
@@ -162,6 +537,29 @@ class TestScrabbleGame(unittest.TestCase):
         expected_score = (('', 'STAC', 'STAC', (11, 13), 'left'), 14)
         self.assertEqual(expected_score, score)
 
+    def test_score_move_tables(self):
+        self.assertEqual(LETTER_MULTIPLIER[0][0], 3)
+        self.assertEqual(WORD_MULTIPLIER[0][4], 3)
+        self.assertEqual(WORD_MULTIPLIER[0][0], 1)
+        # Seven placed letters get the bingo bonus, the A is doubled and both triple word squares triple the word
+        move = ('', 'RECANTS', 'RECANTS', (0, 4), 'right')
+        self.assertEqual(score_move(move), (14 + 1) * 3 * 3 + 40)
+        self.assertEqual(give_scores(move), (move, 175))
+
+    def test_score_move_cross_words(self):
+        # Playing AS below the AT of CAT also forms AA and TS downwards, the cross-checks are not needed to score it
+        board = [row[:] for row in self.board]
+        move = ('', 'AS', 'AS', (8, 8), 'right')
+        # Without a board only AS itself is scored
+        self.assertEqual(score_move(move), 3)
+        # AA scores 2 and TS scores 4
+        self.assertEqual(score_move(move, board), 3 + 2 + 4)
+        cross_scores = precompute_cross_scores(board)
+        self.assertEqual(cross_scores[(8, 9)][ALPHABET.index('S')], 4)
+        self.assertNotIn((8, 11), cross_scores)
+        board[8][8:10] = ['A', 'S']
+        self.assertEqual(update_cross_scores(board, cross_scores, [(8, 8), (8, 9)]), precompute_cross_scores(board))
+
     def test_update_board(self):
         # Place the full word. No left part found
         best_move = ('', 'CATS', 'CATS', (11, 10), 'right')